@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+CSV Obfuscation Benchmark
+
+Generates a synthetic CSV file, obfuscates it with the same entry point as
+the command line tool and reports the time spent in each stage, so that
+performance regressions can be measured.
+
+Stages (as recorded by the tool's RunReport):
+    parse    - Reading the CSV file into rows or chunks
+    profile  - Profiling the columns (streaming mode)
+    classify - Detecting each column's type (default mode)
+    plan     - Building the column plans and value mappings
+    numeric  - Randomizing the numeric values
+    remap    - Replacing the text values using the mappings
+    write    - Writing the obfuscated rows to a CSV file
+
+Usage:
+    python benchmark.py [--rows N] [--columns N] [--mix MIX] [--quoting RATIO]
+                        [--seed SEED] [--stream] [--output FILE] [--baseline FILE]
+                        [--threshold PCT] [--keep-csv PATH]
+
+Arguments:
+    --rows N          - Number of data rows to generate (default 100000)
+    --columns N       - Number of columns; the mix is repeated to fill them
+    --mix MIX         - Column types, e.g. numeric=4,date=1,boolean=1,low_text=2
+    --quoting RATIO   - Fraction of text cells with commas, quotes or newlines
+    --seed SEED       - Random seed for the generated data (default 0)
+    --stream          - Benchmark the streaming mode instead of the default mode
+    --output FILE     - Save the results as JSON
+    --baseline FILE   - Compare against the results of an earlier run
+    --threshold PCT   - Slowdown per stage reported as a regression (default 10)
+    --keep-csv PATH   - Write the generated CSV here instead of a temporary file
+
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then omitted
+    resource = None
+
+import csv_obfuscator
+
+# Column types understood by generate_csv
+COLUMN_TYPES = ('numeric', 'date', 'boolean', 'low_text', 'high_text', 'email')
+
+DEFAULT_MIX = 'numeric=4,date=1,boolean=1,low_text=2,high_text=1,email=1'
+
+LOW_CARDINALITY_VALUES = [
+    'Engineering', 'Marketing', 'Finance', 'HR', 'Sales', 'Legal', 'Support', 'Operations',
+    'Research', 'Procurement', 'Logistics', 'Security', 'Facilities', 'Training', 'Design',
+    'Quality', 'Compliance', 'Strategy', 'Partnerships', 'Analytics', 'Infrastructure',
+    'Product', 'Customer Success', 'Public Relations', 'Investor Relations', 'Audit',
+    'Payroll', 'Recruiting', 'IT', 'Treasury', 'Tax', 'Risk', 'Data', 'Platform', 'Mobile',
+    'Web', 'Retail', 'Wholesale', 'Manufacturing', 'Field Services'
+]
+
+FIRST_NAMES = ['John', 'Maria', 'Li', 'Sarah', 'Ahmed', 'Priya', 'Carlos', 'Olga', 'James',
+               'Fatima', 'Takashi', 'Emma', 'Luis', 'Aisha', 'Hans']
+LAST_NAMES = ['Smith', 'Garcia', 'Wei', 'Johnson', 'Hassan', 'Patel', 'Rodriguez', 'Petrov',
+              'Wilson', 'Al-Farsi', 'Yamamoto', 'Brown', 'Fernandez', 'Mbeki', 'Mueller']
+
+# Text cells that exercise CSV quoting
+QUOTING_SUFFIXES = [', Jr.', ' "the elder"', '\nsecond line']
+
+def parse_mix(mix, columns=None):
+    """
+    Expand a column mix such as 'numeric=4,date=1' into a list of column types.
+
+    Args:
+        mix: Comma-separated type=count pairs
+        columns: Optional total number of columns; the mix is repeated or
+            truncated to this length
+
+    Returns:
+        A list with one column type per column
+    """
+    types = []
+    for part in mix.split(','):
+        name, _, count = part.partition('=')
+        name = name.strip()
+        if name not in COLUMN_TYPES:
+            raise ValueError(f"unknown column type '{name}' (expected one of {', '.join(COLUMN_TYPES)})")
+        types.extend([name] * int(count or 1))
+    if not types:
+        raise ValueError('the column mix is empty')
+    if columns:
+        types = [types[i % len(types)] for i in range(columns)]
+    return types
+
+def _cell(column_type, row_index, rng, quoting):
+    if column_type == 'numeric':
+        if rng.random() < 0.5:
+            return str(rng.randint(0, 100000))
+        return f'{rng.uniform(-1000, 1000):.2f}'
+    if column_type == 'date':
+        return f'{rng.randint(1990, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'
+    if column_type == 'boolean':
+        return 'Yes' if rng.random() < 0.5 else 'No'
+    if column_type == 'email':
+        return f'user{row_index}@example.com'
+
+    if column_type == 'low_text':
+        value = rng.choice(LOW_CARDINALITY_VALUES)
+    else:
+        value = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {row_index}'
+    if quoting and rng.random() < quoting:
+        value += rng.choice(QUOTING_SUFFIXES)
+    return value
+
+def generate_csv(path, rows, column_types, seed=0, quoting=0.01):
+    """
+    Write a synthetic CSV file.
+
+    Args:
+        path: Output path
+        rows: Number of data rows
+        column_types: List of column types (see COLUMN_TYPES)
+        seed: Random seed for the generated values
+        quoting: Fraction of text cells containing commas, quotes or newlines
+    """
+    rng = random.Random(seed)
+    header = [f'{column_type}_{i + 1}' for i, column_type in enumerate(column_types)]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for row_index in range(rows):
+            writer.writerow([_cell(column_type, row_index, rng, quoting)
+                             for column_type in column_types])
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def run_stages(input_file, output_file, seed=0, stream=False):
+    """
+    Obfuscate input_file and collect the time spent in each stage.
+
+    The tool's own entry point (obfuscate_csv, or obfuscate_csv_stream with
+    stream) is run unchanged, and the stage timings are summed from a
+    RunReport hook, so they cover exactly the code that users run.
+
+    Returns:
+        A (row_count, {stage: seconds}, total_seconds) tuple
+    """
+    timings = {}
+
+    def record(stage, wall_seconds, cpu_seconds):
+        timings[stage] = timings.get(stage, 0.0) + wall_seconds
+
+    report = csv_obfuscator.RunReport(hooks=[record])
+    obfuscate = csv_obfuscator.obfuscate_csv_stream if stream else csv_obfuscator.obfuscate_csv
+    # The status line would be mixed into the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        succeeded = obfuscate(input_file, output_file, seed=seed, report=report)
+    if not succeeded:
+        raise RuntimeError(f"obfuscation failed: {report.error['message']}")
+    return report.rows, timings, report.wall
+
+def run_benchmark(rows=100000, column_types=None, seed=0, quoting=0.01, keep_csv=None,
+                  stream=False):
+    """
+    Generate a synthetic CSV file and time each stage of the pipeline.
+
+    Returns:
+        A JSON-serializable dict of results
+    """
+    column_types = column_types or parse_mix(DEFAULT_MIX)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_file = keep_csv or os.path.join(tmp_dir, 'input.csv')
+        output_file = os.path.join(tmp_dir, 'output.csv')
+        generate_csv(input_file, rows, column_types, seed, quoting)
+        input_bytes = os.path.getsize(input_file)
+        row_count, timings, total = run_stages(input_file, output_file, seed, stream)
+
+    return {
+        'config': {
+            'mode': 'stream' if stream else 'memory',
+            'rows': rows,
+            'columns': len(column_types),
+            'column_types': column_types,
+            'quoting': quoting,
+            'seed': seed,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': csv_obfuscator.np is not None,
+        },
+        'input_bytes': input_bytes,
+        'stages': {
+            stage: {
+                'seconds': round(seconds, 6),
+                'rows_per_sec': round(row_count / seconds) if seconds else None,
+            }
+            for stage, seconds in timings.items()
+        },
+        'total_seconds': round(total, 6),
+        'rows_per_sec': round(row_count / total) if total else None,
+        'peak_rss_kb': _peak_rss_kb(),
+    }
+
+def compare_results(results, baseline, threshold=10.0):
+    """
+    Compare stage timings against a baseline run.
+
+    Args:
+        results: Results of the current run
+        baseline: Results of the baseline run
+        threshold: Slowdown in percent above which a stage is a regression
+
+    Returns:
+        A list of (stage, baseline_seconds, seconds, change_percent, regressed) tuples
+    """
+    comparison = []
+    stages = list(baseline.get('stages', {}))
+    stages += [stage for stage in results['stages'] if stage not in stages]
+    for stage in stages + ['total']:
+        if stage == 'total':
+            old, new = baseline.get('total_seconds'), results.get('total_seconds')
+        else:
+            old = baseline.get('stages', {}).get(stage, {}).get('seconds')
+            new = results['stages'].get(stage, {}).get('seconds')
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        comparison.append((stage, old, new, change, change > threshold))
+    return comparison
+
+def print_results(results):
+    config = results['config']
+    print(f"{config['rows']} rows x {config['columns']} columns "
+          f"({results['input_bytes']} bytes), NumPy: {results['environment']['numpy']}")
+    for stage, stage_results in results['stages'].items():
+        print(f"  {stage:<10}{stage_results['seconds']:>10.3f} s"
+              f"{stage_results['rows_per_sec'] or 0:>14,} rows/s")
+    print(f"  {'total':<10}{results['total_seconds']:>10.3f} s"
+          f"{results['rows_per_sec'] or 0:>14,} rows/s")
+    if results['peak_rss_kb'] is not None:
+        print(f"  peak RSS  {results['peak_rss_kb']:>10,} KB")
+
+def main():
+    """Main function to handle command line arguments."""
+    parser = argparse.ArgumentParser(description='Benchmark the CSV obfuscator.')
+    parser.add_argument('--rows', type=int, default=100000,
+                        help='Number of data rows to generate (default 100000)')
+    parser.add_argument('--columns', type=int,
+                        help='Number of columns; the mix is repeated to fill them')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f'Column types and counts (default {DEFAULT_MIX})')
+    parser.add_argument('--quoting', type=float, default=0.01,
+                        help='Fraction of text cells with commas, quotes or newlines (default 0.01)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed for the generated data (default 0)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Benchmark the streaming mode instead of the default mode')
+    parser.add_argument('--output', help='Save the results as JSON')
+    parser.add_argument('--baseline', help='Compare against the JSON results of an earlier run')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Slowdown per stage in percent reported as a regression (default 10)')
+    parser.add_argument('--keep-csv', metavar='PATH',
+                        help='Write the generated CSV here instead of a temporary file')
+
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rows, parse_mix(args.mix, args.columns), args.seed,
+                            args.quoting, args.keep_csv, args.stream)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = 0
+        print(f"Compared with {args.baseline} (threshold {args.threshold:g}%):")
+        if baseline.get('config') != results['config']:
+            print("  Note: the baseline was run with a different configuration")
+        for stage, old, new, change, regressed in compare_results(results, baseline,
+                                                                  args.threshold):
+            regressions += regressed
+            print(f"  {stage:<10}{old:>10.3f} s -> {new:.3f} s ({change:+.1f}%)"
+                  f"{'  REGRESSION' if regressed else ''}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
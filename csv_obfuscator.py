@@ -7,22 +7,129 @@ This tool performs two types of obfuscation on CSV files:
 2. Replaces unique values in each column with meaningful English words in the same context
 
 Usage:
-    python csv_obfuscator.py input.csv output.csv [--seed SEED]
+    python csv_obfuscator.py batch INPUT_DIR_OR_GLOB OUTPUT_DIR [--workers N]
+                             [--domain DOMAIN=PATTERN[,PATTERN...]] [--report FILE]
+    python csv_obfuscator.py serve [--host HOST] [--port PORT | --unix PATH] [--warmup N]
+    python csv_obfuscator.py input.csv output.csv [--seed SEED] [--variation PCT]
+                             [--mapping-store PATH] [--schema FILE] [--incremental]
+                             [--words SPEC] [--warmup N] [--date-shift DAYS]
+                             [--stream] [--pipeline] [--queue-size N] [--chunk-size N]
+                             [--sample-size N] [--confidence C]
+                             [--workers N] [--chunk-bytes N]
+                             [--report FILE] [--profile [PATH]]
 
 Arguments:
-    input.csv   - Path to the input CSV file
-    output.csv  - Path to the output CSV file
-    --seed SEED - Optional random seed for reproducibility
+    input.csv       - Path to the input CSV file (may end in .gz, .bz2 or .xz), or - for stdin
+    output.csv      - Path to the output CSV file (compressed likewise), or - for stdout
+    --seed SEED     - Optional random seed for reproducibility
+    --variation PCT - Percentage range for numeric randomization (default 20)
+    --mapping-store PATH - SQLite file of value mappings reused across files and runs
+    --schema FILE   - JSON per-column treatments that replace type inference
+    --words SPEC    - Word file for a category (CATEGORY=PATH) or a directory of them
+    --date-shift DAYS - Shift each date column by a random offset within +/- DAYS
+    --warmup N      - Rows of stdin (or a socket stream) profiled before output starts
+    --incremental   - Only obfuscate rows appended since the last run
+    --stream        - Process the file in bounded memory with two streaming passes
+    --pipeline      - Stream with overlapping reader, obfuscation and writer threads
+    --queue-size N  - Chunks buffered between the pipeline threads
+    --chunk-size N  - Rows held in memory at a time in streaming mode
+    --sample-size N - Per-column reservoir used to decide column types early
+    --confidence C  - Confidence required for a sample-based decision
+    --workers N     - Obfuscate in parallel using N worker processes
+    --chunk-bytes N - Bytes per parallel task (keep fixed for reproducible output)
+    --report FILE   - Write a JSON report of timings and column decisions
+    --profile [PATH] - Save cProfile stats of the run (default OUTPUT.prof)
+    --domain SPEC   - Batch mode: share mappings between columns whose names match
 
 """
 
 import argparse
+import asyncio
+import bz2
+import cProfile
 import csv
+import fnmatch
+import glob
+import gzip
+import io
+import itertools
+import json
+import lzma
+import mmap
+import os
+import queue
 import random
+import sqlite3
 import sys
 import math
 import re
-from collections import defaultdict
+import threading
+import time
+import traceback
+from collections import Counter, OrderedDict, deque
+from collections.abc import Sequence
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing, contextmanager
+from datetime import date, timedelta
+from functools import partial
+from statistics import NormalDist
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batches fall back to array/random
+    np = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak memory is then omitted
+    resource = None
+
+# Default percentage range for numeric randomization (±20%)
+DEFAULT_VARIATION_PERCENT = 20
+
+# Batches smaller than this are randomized in pure Python even with NumPy
+NUMPY_MIN_BATCH = 64
+
+# Number of rows read, transformed and written at a time in streaming mode
+DEFAULT_CHUNK_SIZE = 10000
+
+# Number of (domain, value) lookups kept in memory in front of a mapping store
+DEFAULT_MAPPING_CACHE_SIZE = 100000
+
+# Number of distinct values whose shifted dates a date column keeps in memory
+DATE_CACHE_SIZE = 65536
+
+# Suffix of the checkpoint written next to the output in incremental mode
+STATE_SUFFIX = '.state.json'
+
+# Size of the byte ranges processed by each task in parallel mode. Output is
+# only reproducible between runs that use the same value.
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+
+# Chunks buffered between the reader, processing and writer threads in
+# pipelined mode
+DEFAULT_QUEUE_SIZE = 4
+
+# Rows read from a non-seekable input (e.g. stdin) to build the column plans
+# before any row is written
+DEFAULT_WARMUP_ROWS = 1000
+
+# Default TCP port of the serve subcommand
+DEFAULT_SERVE_PORT = 8765
+
+# Files picked up when the batch input is a directory
+BATCH_SUFFIXES = ('.csv', '.csv.gz', '.csv.bz2', '.csv.xz')
+
+# Openers for compressed input and output files, chosen by file extension
+COMPRESSED_OPENERS = {
+    '.gz': partial(gzip.open, compresslevel=6),
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+# Column treatments that a schema can name (see load_schema)
+SCHEMA_TYPES = ('passthrough', 'numeric', 'words', 'surrogate', 'drop', 'date')
 
 # Will be used to generate contextually relevant words for replacement
 WORD_CATEGORIES = {
@@ -155,6 +262,373 @@ WORD_CATEGORIES = {
     ]
 }
 
+# Suffix of the offset index cached next to an external word file
+WORD_INDEX_SUFFIX = '.idx'
+
+class WordList(Sequence):
+    """
+    The words of a newline-delimited file, memory-mapped with an offset index.
+
+    Word i is read in constant time without loading the file, so lists of
+    hundreds of thousands of words cost almost nothing until words are
+    drawn from them. The index of line offsets is built by one scan of the
+    file and cached next to it (path + WORD_INDEX_SUFFIX), so later runs map
+    the cached index instead of scanning again. Blank lines are skipped;
+    the words should be unique.
+
+    Args:
+        path: Path of the word file (UTF-8, one word or phrase per line)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b''
+        self._offsets = self._load_index(stat)
+
+    def __getstate__(self):
+        # Worker processes map the file again instead of receiving its contents
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def _load_index(self, stat):
+        index_file = self.path + WORD_INDEX_SUFFIX
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        try:
+            with open(index_file, 'rb') as f:
+                index_buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            offsets = memoryview(index_buf).cast('Q')
+            if len(offsets) >= 2 and tuple(offsets[:2]) == stamp:
+                return offsets[2:]
+        except (OSError, ValueError, TypeError):
+            pass
+
+        offsets = array('Q', stamp)
+        buf = self._buf
+        pos, size = 0, len(buf)
+        while pos < size:
+            end = buf.find(b'\n', pos)
+            if end < 0:
+                end = size
+            if buf[pos:end].strip():
+                offsets.append(pos)
+            pos = end + 1
+        try:
+            tmp_file = index_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                offsets.tofile(f)
+            os.replace(tmp_file, index_file)
+        except OSError:
+            pass  # e.g. a read-only directory: the index is rebuilt next time
+        return memoryview(offsets)[2:]
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._offsets)
+        if not 0 <= index < len(self._offsets):
+            raise IndexError('word index out of range')
+        start = self._offsets[index]
+        end = self._buf.find(b'\n', start)
+        if end < 0:
+            end = len(self._buf)
+        return self._buf[start:end].decode('utf-8').strip()
+
+# External word files registered with register_word_file, by category, and
+# the WordLists opened from them so far
+_WORD_FILES = {}
+_WORD_LISTS = {}
+
+def register_word_file(category, path):
+    """
+    Draw the replacements of a category from a newline-delimited word file.
+
+    The file replaces the built-in list of a WORD_CATEGORIES key, or adds a
+    new category that schemas can name. It is only opened (memory-mapped)
+    when a column first uses the category.
+    """
+    if not os.path.isfile(path):
+        raise ValueError(f"word file '{path}' for category '{category}' does not exist")
+    # Only read up to the first word; an empty list could never give replacements
+    with open(path, 'rb') as f:
+        if not any(line.strip() for line in f):
+            raise ValueError(f"word file '{path}' for category '{category}' has no words")
+    _WORD_FILES[category] = path
+    _WORD_LISTS.pop(category, None)
+
+def register_words(spec):
+    """
+    Register word files from a command line spec: CATEGORY=PATH, or a
+    directory whose *.txt files are registered under their base names.
+    """
+    if '=' in spec:
+        category, path = spec.split('=', 1)
+        register_word_file(category, path)
+    elif os.path.isdir(spec):
+        for name in sorted(os.listdir(spec)):
+            if name.endswith('.txt'):
+                register_word_file(name[:-len('.txt')], os.path.join(spec, name))
+    else:
+        raise ValueError(f"word spec '{spec}' is neither CATEGORY=PATH nor a directory")
+
+def has_category(category):
+    return category in _WORD_FILES or category in WORD_CATEGORIES
+
+def get_words(category):
+    """Return the words of a category: a WordList for registered files, else the built-in list."""
+    path = _WORD_FILES.get(category)
+    if path is None:
+        return WORD_CATEGORIES[category]
+    words = _WORD_LISTS.get(category)
+    if words is None:
+        words = _WORD_LISTS[category] = WordList(path)
+    return words
+
+def sample_free_words(words, count, used_among, used_count, rng=random):
+    """
+    Draw count distinct random words that are not used yet.
+
+    Args:
+        words: Word list of a category (a list or a WordList)
+        count: Number of words needed
+        used_among: Function returning the set of the given words already used
+        used_count: Upper bound on the number of words of the list already used
+        rng: Random number source (default: the global random module)
+
+    Returns:
+        A list of count words, or None if there may not be enough unused words
+    """
+    if not isinstance(words, WordList):
+        used = used_among(words)
+        free = [word for word in dict.fromkeys(words) if word not in used]
+        return rng.sample(free, count) if count <= len(free) else None
+
+    # Large lists are never scanned: count + used_count distinct positions
+    # are bound to hold count unused words (if the words are unique)
+    if count > len(words) - used_count:
+        return None
+    order = rng.sample(range(len(words)), count + used_count)
+    picked = {}
+    for start in range(0, len(order), 500):
+        batch = [words[i] for i in order[start:start + 500]]
+        used = used_among(batch)
+        for word in batch:
+            if word not in used and word not in picked:
+                picked[word] = None
+                if len(picked) == count:
+                    return list(picked)
+    return None
+
+# Precompiled patterns shared by the column detection functions
+NUMERIC_PATTERN = re.compile(r'^-?\d+(\.\d+)?$')
+
+# Date formats, each matched against a whole value. The named groups mark
+# the parts rewritten when dates are shifted (see shift_date); day-first
+# 'dmy' is tried before 'mdy' for columns that fit both. Days and months
+# must be in range, and dotted dates need a 4-digit year so that version
+# numbers such as 3.14.15 are not taken for dates.
+_DAY = r'(?:0?[1-9]|[12]\d|3[01])'
+_MONTH_NUMBER = r'(?:0?[1-9]|1[0-2])'
+_SHORT_YEAR = r'\d{4}|(?<!\.)\d{2}'
+_MONTH = (r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+          r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)')
+_TIME = r'(?:[T ]\d{1,2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?(?:\s*[ap]m)?)?'
+_ZONE = r'(?:\s*(?:z|utc|[+-]\d{2}(?::?\d{2})?))?'
+_DATE_FORMAT_SOURCES = [
+    # 2020-03-15, 2020/03/15, ISO 8601 timestamps with a timezone
+    ('ymd', r'(?P<Y>\d{4})[-/.](?P<m>' + _MONTH_NUMBER + r')[-/.](?P<d>' + _DAY + r')'
+            + _TIME + _ZONE),
+    # 15/03/2020, 15-03-20, 15.03.2020
+    ('dmy', r'(?P<d>' + _DAY + r')[-/.](?P<m>' + _MONTH_NUMBER + r')[-/.](?P<Y>' + _SHORT_YEAR
+            + r')' + _TIME),
+    # 03/15/2020
+    ('mdy', r'(?P<m>' + _MONTH_NUMBER + r')[-/.](?P<d>' + _DAY + r')[-/.](?P<Y>' + _SHORT_YEAR
+            + r')' + _TIME),
+    # 15 March 2020, 15-Mar-20
+    ('d_mon_y', r'(?P<d>' + _DAY + r')(?P<th>st|nd|rd|th)?[-/ ](?P<mon>' + _MONTH + r')\.?,?[-/ ]\s*'
+                r'(?P<Y>\d{4}|\d{2})' + _TIME),
+    # March 15, 2020
+    ('mon_d_y', r'(?P<mon>' + _MONTH + r')\.?[-/ ](?P<d>' + _DAY + r')(?P<th>st|nd|rd|th)?,?[-/ ]\s*'
+                r'(?P<Y>\d{4}|\d{2})' + _TIME),
+    # Unix epoch seconds: indistinguishable from integer ids, so only used
+    # for columns a schema declares (see load_schema), never inferred
+    ('epoch', r'(?P<epoch>\d{1,12}(?:\.\d+)?)'),
+]
+DATE_FORMATS = OrderedDict(
+    (name, re.compile(r'\s*(?:' + source + r')\s*\Z', re.I))
+    for name, source in _DATE_FORMAT_SOURCES)
+# Formats recognized by type inference, in the order they are tried when
+# reading the dates of an inferred date column; epoch must be declared
+INFERRED_DATE_FORMATS = ('ymd', 'dmy', 'mdy', 'd_mon_y', 'mon_d_y')
+MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+               'September', 'October', 'November', 'December')
+# One anchored matcher for type inference: the inferred formats without
+# their group names
+DATE_MATCHER = re.compile(
+    r'\s*(?:' + '|'.join(re.sub(r'\(\?P<\w+>', '(?:', source)
+                          for name, source in _DATE_FORMAT_SOURCES
+                          if name in INFERRED_DATE_FORMATS) + r')\s*\Z', re.I).match
+DATE_LIKE_PATTERN = re.compile(r'\d{1,4}[-/]\d{1,2}[-/]\d{1,4}')
+CURRENCY_PATTERN = re.compile(r'[$€£¥]')
+ADDRESS_PATTERN = re.compile(r'\b(street|st|avenue|ave|road|rd|boulevard|blvd)\b', re.I)
+
+def _matches_date(value):
+    """Check if a single stripped value is a date in one of the inferred formats."""
+    return DATE_MATCHER(value) is not None
+
+def _rewrite_month(text, month):
+    """Write month in the style of text: full or abbreviated name, same case."""
+    name = MONTH_NAMES[month - 1]
+    if text.title() not in MONTH_NAMES:
+        name = name[:3]
+    if text.isupper():
+        return name.upper()
+    if text.islower():
+        return name.lower()
+    return name
+
+def _ordinal_suffix(day):
+    if day in (11, 12, 13):
+        return 'th'
+    return {1: 'st', 2: 'nd', 3: 'rd'}.get(day % 10, 'th')
+
+def _month_number(text):
+    return [name[:3] for name in MONTH_NAMES].index(text[:3].title()) + 1
+
+def _shift_match(match, days):
+    """Shift the date matched by one of DATE_FORMATS; raises ValueError if invalid."""
+    value = match.string
+    if 'epoch' in match.re.groupindex:
+        whole, point, fraction = match.group('epoch').partition('.')
+        start, end = match.span('epoch')
+        return f'{value[:start]}{int(whole) + days * 86400}{point}{fraction}{value[end:]}'
+
+    year_text = match.group('Y')
+    year = int(year_text)
+    if len(year_text) == 2:
+        # Same pivot as strptime's %y
+        year += 2000 if year < 69 else 1900
+    month_text = match.group('m') if 'm' in match.re.groupindex else match.group('mon')
+    month = int(month_text) if month_text.isdigit() else _month_number(month_text)
+    try:
+        shifted = date(year, month, int(match.group('d'))) + timedelta(days)
+    except OverflowError as e:
+        raise ValueError(str(e))
+
+    day_text = match.group('d')
+    # All-numeric dates keep their width; with month names, days are only
+    # padded if they were
+    day_width = len(day_text) if month_text.isdigit() or day_text[0] == '0' else 1
+    parts = [('Y', str(shifted.year % 100 if len(year_text) == 2 else shifted.year)
+              .zfill(len(year_text))),
+             ('d', str(shifted.day).zfill(day_width))]
+    if month_text.isdigit():
+        parts.append(('m', str(shifted.month).zfill(len(month_text))))
+    else:
+        parts.append(('mon', _rewrite_month(month_text, shifted.month)))
+        if match.group('th'):
+            suffix = _ordinal_suffix(shifted.day)
+            parts.append(('th', suffix.upper() if match.group('th').isupper() else suffix))
+    # Replace from the end so the earlier spans stay valid
+    for group, text in sorted(parts, key=lambda part: match.start(part[0]), reverse=True):
+        start, end = match.span(group)
+        value = value[:start] + text + value[end:]
+    return value
+
+def shift_date(value, days, formats=None):
+    """
+    Move a date by a number of days, keeping its format.
+
+    Only the day, month and year of the value are rewritten, with their
+    original widths and month name style, so times and timezones are kept;
+    epoch seconds move by whole days.
+
+    Args:
+        value: The cell value
+        days: Number of days to add (may be negative)
+        formats: Names of DATE_FORMATS to try in turn (default
+            INFERRED_DATE_FORMATS); the first one giving a valid date is used
+
+    Returns:
+        The shifted value, or None if it is not a date in any of formats
+    """
+    for name in formats or INFERRED_DATE_FORMATS:
+        match = DATE_FORMATS[name].match(value)
+        if match is not None:
+            try:
+                return _shift_match(match, days)
+            except ValueError:
+                continue
+    return None
+
+def detect_date_format(values, formats=INFERRED_DATE_FORMATS):
+    """
+    Return the first of formats that reads every date among values, or None.
+
+    Values that are not a valid date in any of the formats are ignored, so
+    a column mixing day-first and month-first dates gets None and each value
+    is then read with the first format that fits it.
+    """
+    candidates = list(formats)
+    found = False
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        fitting = [name for name in candidates if shift_date(value, 0, (name,)) is not None]
+        if fitting:
+            candidates = fitting
+            found = True
+        elif shift_date(value, 0, formats) is not None:
+            return None
+    return candidates[0] if found else None
+
+def _pick_date_shift(days, rng=random):
+    """Random non-zero offset within +/- days, or None when days is not set."""
+    if not days:
+        return None
+    return rng.choice((-1, 1)) * rng.randint(1, abs(days))
+
+def _exceeds_ratio(items, listed, total, matches, threshold):
+    """
+    Check if the matching (value, count) items make up over threshold of total.
+
+    listed is the sum of the counts of items; the remaining total - listed
+    cells are misses. The scan stops as soon as the outcome is decided:
+    once enough cells have matched, or once too many have missed for the
+    rest to reach the threshold.
+    """
+    if not total:
+        return False
+    hits = 0
+    remaining = listed
+    for value, count in items:
+        remaining -= count
+        if matches(value):
+            hits += count
+            if hits / total > threshold:
+                return True
+        elif (hits + remaining) / total <= threshold:
+            return False
+    return hits / total > threshold
+
+def _category_for_length(avg_len):
+    """Default word category for text of the given average length."""
+    if avg_len < 10:
+        return 'colors'
+    elif avg_len < 15:
+        return 'animals'
+    elif avg_len < 20:
+        return 'fruits'
+    elif avg_len < 30:
+        return 'companies'
+    else:
+        return 'jobs'
+
 def detect_column_type(values):
     """
     Attempt to determine the semantic type of a column based on its values.
@@ -167,7 +641,7 @@ def detect_column_type(values):
         return 'names'  # Default if no values
     
     # Check if values are mostly numeric
-    numeric_count = sum(1 for v in str_values if re.match(r'^-?\d+(\.\d+)?$', v))
+    numeric_count = sum(1 for v in str_values if NUMERIC_PATTERN.match(v))
     if numeric_count / len(str_values) > 0.7:
         return 'products'  # Use products for numeric columns
     
@@ -185,31 +659,20 @@ def detect_column_type(values):
         return 'names'  # Use names for email prefixes
     
     # Check for date-like patterns
-    date_pattern = re.compile(r'\d{1,4}[-/]\d{1,2}[-/]\d{1,4}')
-    if any(date_pattern.search(v) for v in str_values):
+    if any(DATE_LIKE_PATTERN.search(v) for v in str_values):
         return 'fruits'  # Use fruits for dates
     
     # Check for currency-like patterns
-    currency_pattern = re.compile(r'[$€£¥]')
-    if any(currency_pattern.search(v) for v in str_values):
+    if any(CURRENCY_PATTERN.search(v) for v in str_values):
         return 'products'  # Use products for currency
     
     # Check for address-like patterns
-    if any(re.search(r'\b(street|st|avenue|ave|road|rd|boulevard|blvd)\b', v, re.I) for v in str_values):
+    if any(ADDRESS_PATTERN.search(v) for v in str_values):
         return 'cities'
     
     # Default categories based on average length
     avg_len = sum(len(v) for v in str_values) / len(str_values)
-    if avg_len < 10:
-        return 'colors'
-    elif avg_len < 15:
-        return 'animals'
-    elif avg_len < 20:
-        return 'fruits'
-    elif avg_len < 30:
-        return 'companies'
-    else:
-        return 'jobs'
+    return _category_for_length(avg_len)
 
 def is_numeric(value):
     """Check if a value is numeric."""
@@ -219,13 +682,14 @@ def is_numeric(value):
     except (ValueError, TypeError):
         return False
 
-def randomize_numeric_value(value, variation_percent=20):
+def randomize_numeric_value(value, variation_percent=DEFAULT_VARIATION_PERCENT, rng=random):
     """
     Randomize a numeric value within a specified percentage range.
     
     Args:
         value: The original numeric value
         variation_percent: The percentage range for variation (default 20%)
+        rng: Random number source (default: the global random module)
         
     Returns:
         A randomized value within the specified range
@@ -252,7 +716,7 @@ def randomize_numeric_value(value, variation_percent=20):
         elif num_value < 0 and max_val > 0 and num_value < -0.1:
             max_val = 0
             
-        randomized = random.uniform(min_val, max_val)
+        randomized = rng.uniform(min_val, max_val)
         
         # Return as integer if the original was an integer
         if is_int:
@@ -268,6 +732,63 @@ def randomize_numeric_value(value, variation_percent=20):
         # Return the original value if it's not numeric
         return value
 
+def _numeric_bounds(num_value, scale):
+    """Range used by randomize_numeric_value for a single parsed value."""
+    variation = abs(num_value) * scale
+    if abs(num_value) < 0.1:
+        variation = max(variation, 0.01)
+    min_val = num_value - variation
+    max_val = num_value + variation
+    if num_value > 0 and min_val < 0 and num_value > 0.1:
+        min_val = 0
+    elif num_value < 0 and max_val > 0 and num_value < -0.1:
+        max_val = 0
+    return min_val, max_val
+
+def _randomize_array(nums, scale, rng):
+    """Draw one randomized value per entry of nums, as an array('d')."""
+    if np is not None and len(nums) >= NUMPY_MIN_BATCH:
+        x = np.frombuffer(nums, dtype=np.float64)
+        magnitude = np.abs(x)
+        variation = magnitude * scale
+        variation = np.where(magnitude < 0.1, np.maximum(variation, 0.01), variation)
+        min_val = x - variation
+        max_val = x + variation
+        min_val = np.where((x > 0.1) & (min_val < 0), 0.0, min_val)
+        max_val = np.where((x < -0.1) & (max_val > 0), 0.0, max_val)
+        # Seed the NumPy stream from rng so seeded runs stay reproducible
+        generator = np.random.default_rng(rng.getrandbits(64))
+        randomized = min_val + (max_val - min_val) * generator.random(len(x))
+        return array('d', randomized.tobytes())
+
+    # random.uniform(a, b) is a + (b - a) * random(), so this draws exactly
+    # what per-cell calls to randomize_numeric_value would
+    draw = rng.random
+    randomized = array('d', bytes(8 * len(nums)))
+    for k, num_value in enumerate(nums):
+        min_val, max_val = _numeric_bounds(num_value, scale)
+        randomized[k] = min_val + (max_val - min_val) * draw()
+    return randomized
+
+def randomize_numeric_batch(values, variation_percent=DEFAULT_VARIATION_PERCENT, rng=random):
+    """
+    Randomize every numeric value of a batch (typically a column chunk).
+    
+    Applies the same rules as randomize_numeric_value: sign preservation,
+    a minimum variation of 0.01 for values close to zero, integers stay
+    integers and decimals keep their number of decimal places. Each value is
+    parsed once; the noise is drawn with NumPy when it is installed.
+    
+    Args:
+        values: List of cell values
+        variation_percent: The percentage range for variation (default 20%)
+        rng: Random number source (default: the global random module)
+        
+    Returns:
+        A new list where numeric values are randomized and other values are unchanged
+    """
+    return list(NumericColumn.parse(values).randomize(variation_percent, rng))
+
 def is_date_column(values):
     """
     Check if a column appears to contain date values.
@@ -278,28 +799,12 @@ def is_date_column(values):
     Returns:
         True if the column appears to contain dates, False otherwise
     """
-    # Common date patterns
-    date_patterns = [
-        r'\d{1,4}[-/\.]\d{1,2}[-/\.]\d{1,4}',  # YYYY-MM-DD, DD-MM-YYYY, etc.
-        r'\d{1,2}[-/\s][A-Za-z]{3,9}[-/\s]\d{2,4}',  # DD Month YYYY
-        r'[A-Za-z]{3,9}[-/\s]\d{1,2}[-/\s]\d{2,4}'   # Month DD YYYY
-    ]
-    
-    # Count matches for date patterns
-    date_count = 0
-    non_empty_values = [str(v).strip() for v in values if v is not None and v != '']
-    
-    if not non_empty_values:
-        return False
-    
-    for value in non_empty_values:
-        for pattern in date_patterns:
-            if re.search(pattern, value):
-                date_count += 1
-                break
+    non_empty_values = [v for v in values if v is not None and v != '']
     
-    # If more than 70% of non-empty values match date patterns, consider it a date column
-    return date_count / max(1, len(non_empty_values)) > 0.7
+    # More than 70% of non-empty values must be dates; the scan stops as
+    # soon as that is reached or out of reach
+    return _exceeds_ratio(((v, 1) for v in non_empty_values), len(non_empty_values),
+                          len(non_empty_values), lambda v: _matches_date(str(v).strip()), 0.7)
 
 def is_boolean_column(values):
     """
@@ -311,38 +816,16 @@ def is_boolean_column(values):
     Returns:
         True if the column appears to be boolean, False otherwise
     """
-    # Get unique non-empty values
-    non_empty_values = [str(v).strip().lower() for v in values if v is not None and v != '']
-    
-    if not non_empty_values:
-        return False
-    
-    # Check if there are fewer than 3 unique values
-    unique_values = set(non_empty_values)
-    
-    if len(unique_values) < 3:
-        # Common boolean-like values
-        boolean_pairs = [
-            {'true', 'false'},
-            {'yes', 'no'},
-            {'y', 'n'},
-            {'1', '0'},
-            {'on', 'off'},
-            {'active', 'inactive'},
-            {'enabled', 'disabled'},
-            {'t', 'f'}
-        ]
-        
-        # Check if unique values match common boolean patterns
-        lowercase_unique = {v.lower() for v in unique_values}
-        for pair in boolean_pairs:
-            if lowercase_unique.issubset(pair):
-                return True
-        
-        # If not matching common patterns but still fewer than 3 values, consider it boolean-like
-        return True
-    
-    return False
+    # Fewer than 3 distinct values is enough, whether or not they form a
+    # common pair such as true/false or yes/no, so stop at the third
+    unique_values = set()
+    for v in values:
+        if v is None or v == '':
+            continue
+        unique_values.add(str(v).strip().lower())
+        if len(unique_values) >= 3:
+            return False
+    return bool(unique_values)
 
 def replace_unique_values(data):
     """
@@ -362,105 +845,3058 @@ def replace_unique_values(data):
     columns = list(zip(*data))
     replaced_columns = []
     
-    for col_idx, column in enumerate(columns):
-        # Find unique values in this column
-        non_empty_values = [v for v in column if v is not None and v != '']
-        
-        # Skip replacement if the column is mostly numeric
-        numeric_count = sum(1 for v in non_empty_values if is_numeric(v))
-        if numeric_count / max(1, len(non_empty_values)) > 0.7:
-            replaced_columns.append(column)
-            continue
-        
-        # Skip replacement if the column contains dates
-        if is_date_column(column):
-            replaced_columns.append(column)
-            continue
-        
-        # Skip replacement if the column is boolean-like with fewer than 3 unique values
-        if is_boolean_column(column):
+    for column in columns:
+        # Classify the column once per distinct value; numeric, date and
+        # boolean-like columns are kept as they are
+        encoded = DictionaryColumn.encode(column)
+        profiler = ColumnProfiler()
+        profiler.update_counts(encoded.items())
+        plan = profiler.plan()
+        if plan.kind != 'words':
             replaced_columns.append(column)
             continue
-            
-        # Determine the best category for this column
-        category = detect_column_type(non_empty_values)
-        word_list = WORD_CATEGORIES[category]
-        
-        # Create mapping for unique values
-        unique_non_empty = set(non_empty_values)
-        if len(unique_non_empty) > len(word_list):
-            # If we have more unique values than words, we'll cycle through the word list
-            word_mapping = {}
-            for i, value in enumerate(unique_non_empty):
-                word_mapping[value] = word_list[i % len(word_list)]
-        else:
-            # Otherwise, we'll use a random sample of words
-            replacement_words = random.sample(word_list, len(unique_non_empty))
-            word_mapping = dict(zip(unique_non_empty, replacement_words))
         
-        # Replace values in the column
-        new_column = []
-        for value in column:
-            if value is not None and value != '' and not is_numeric(value):
-                new_column.append(word_mapping.get(value, value))
-            else:
-                new_column.append(value)
-                
-        replaced_columns.append(new_column)
+        # Numeric cells are not in the mapping and keep their value
+        replaced_columns.append(encoded.remap(plan.mapping).decode())
     
     # Transpose back to rows
     return list(zip(*replaced_columns))
 
-def obfuscate_csv(input_file, output_file, seed=None):
+class ColumnPlan(object):
     """
-    Obfuscate a CSV file by randomizing numeric values and replacing unique values.
+    The treatment chosen for a single column, built once and applied per cell.
+
+    Attributes:
+        kind: One of 'numeric', 'date', 'boolean' or 'words', or one of
+            'passthrough' (cells copied unchanged) and 'drop' (column left
+            out of the output), which only come from a schema
+        category: The word category (see get_words) used for 'words' columns
+        mapping: Dict of original value -> replacement word for 'words' columns
+            (or a SurrogateMapping / StoreMapping); for 'numeric', 'date' and
+            'boolean' columns, replacements of the text values first seen
+            after profiling that the plan cannot transform (see extend)
+        kept_values: Text values of a 'boolean' column seen when it was
+            profiled, which are kept as they are; values first seen later
+            get replacements (see extend). None keeps every value
+        variation_percent: Percentage range for numeric randomization
+        surrogate_key: Key of the surrogates used once a dict mapping runs
+            out of category words (see extend)
+        next_ordinal: Next unused index of those surrogates
+        reason: Why the column was given this treatment
+        date_shift: Days added to every date of a 'date' column, or None to
+            keep the dates as they are
+        date_format: Name of the DATE_FORMATS entry of a 'date' column,
+            declared by a schema or detected from its values, or None to
+            try INFERRED_DATE_FORMATS for each value
+    """
+
+    def __init__(self, kind, category=None, mapping=None,
+                 variation_percent=DEFAULT_VARIATION_PERCENT, surrogate_key=None,
+                 next_ordinal=0, reason=None, date_shift=None, date_format=None,
+                 kept_values=None):
+        self.kind = kind
+        self.category = category
+        self.mapping = mapping if mapping is not None else {}
+        self.variation_percent = variation_percent
+        self.surrogate_key = surrogate_key
+        self.next_ordinal = next_ordinal
+        self.reason = reason
+        self.date_shift = date_shift
+        self.date_format = date_format
+        self.kept_values = kept_values
+        # Shifted form of the distinct dates seen so far
+        self._shifted_dates = {}
+
+    def extend(self, values, rng=random):
+        """
+        Assign replacements to the text values of a 'words' column that have none yet.
+
+        Existing replacements never change. Dict mappings take unused words
+        from the category while they last and then unique surrogates;
+        SurrogateMapping and StoreMapping assign new surrogates or words in
+        the same way as when they were built. Random choices are drawn from
+        rng (default: the global random module).
+
+        Columns decided from a sample (a warm-up or an earlier incremental
+        run) may hold text the plan cannot transform further down: text in a
+        'numeric' column, text that is not a date in a 'date' column, or a
+        value of a 'boolean' column other than the ones it was decided from.
+        Such values get replacements too, from the category that fits the
+        first of them, instead of leaking.
+        """
+        if self.kind not in ('words', 'numeric', 'date', 'boolean'):
+            return
+        if self.kind == 'boolean' and self.kept_values is None:
+            return
+        mapping = self.mapping
+        new_values = [value for value in dict.fromkeys(values)
+                      if isinstance(value, str) and value != '' and value not in mapping
+                      and not is_numeric(value)]
+        if self.kind == 'boolean':
+            kept = self.kept_values
+            new_values = [value for value in new_values if value not in kept]
+        elif self.kind == 'date':
+            new_values = [value for value in new_values if not self.is_date(value)]
+        if not new_values:
+            return
+        if self.category is None:
+            self.category = detect_column_type(new_values)
+
+        if isinstance(mapping, StoreMapping):
+            mapping.store.assign(mapping.domain, self.category, new_values, rng)
+        elif isinstance(mapping, SurrogateMapping):
+            for value in new_values:
+                mapping.index[value] = len(mapping.index)
+        else:
+            if self.surrogate_key is None:
+                used = set(mapping.values())
+                words = sample_free_words(get_words(self.category), len(new_values),
+                                          used.intersection, len(used), rng)
+                if words is not None:
+                    mapping.update(zip(new_values, words))
+                    return
+            # Out of words: continue with composite surrogates, which never
+            # collide with plain category words
+            if self.surrogate_key is None:
+                self.surrogate_key = rng.getrandbits(63)
+            generator = SurrogateGenerator(self.category, 1, self.surrogate_key)
+            for value in new_values:
+                mapping[value] = generator[self.next_ordinal]
+                self.next_ordinal += 1
+
+    def to_dict(self):
+        """Return a JSON-serializable description of this plan."""
+        data = {'kind': self.kind, 'category': self.category,
+                'variation_percent': self.variation_percent, 'reason': self.reason}
+        mapping = self.mapping
+        if self.kind == 'date':
+            data['date_shift'] = self.date_shift
+            data['date_format'] = self.date_format
+        if self.kind == 'boolean' and self.kept_values is not None:
+            data['kept_values'] = sorted(self.kept_values)
+        if self.kind in ('numeric', 'date', 'boolean') and mapping:
+            data['mapping'] = mapping
+            if self.surrogate_key is not None:
+                data['surrogate_key'] = self.surrogate_key
+                data['next_ordinal'] = self.next_ordinal
+        if self.kind != 'words':
+            return data
+        if isinstance(mapping, StoreMapping):
+            data['store_domain'] = mapping.domain
+        elif isinstance(mapping, SurrogateMapping):
+            data['surrogates'] = {'key': mapping.generator.key,
+                                  'size': mapping.generator.size,
+                                  'values': list(mapping.index)}
+        else:
+            data['mapping'] = mapping
+            if self.surrogate_key is not None:
+                data['surrogate_key'] = self.surrogate_key
+                data['next_ordinal'] = self.next_ordinal
+        return data
+
+    @classmethod
+    def from_dict(cls, data, mapping_store=None):
+        """
+        Rebuild a plan from the output of to_dict.
+
+        Args:
+            data: Dict produced by to_dict
+            mapping_store: The MappingStore of plans that were built with one
+        """
+        if 'store_domain' in data:
+            if mapping_store is None:
+                raise ValueError(f"column plan for domain '{data['store_domain']}' "
+                                 "needs its mapping store")
+            mapping = StoreMapping(mapping_store, data['store_domain'], data['category'])
+        elif 'surrogates' in data:
+            surrogates = data['surrogates']
+            generator = SurrogateGenerator(data['category'], surrogates['size'],
+                                           surrogates['key'])
+            mapping = SurrogateMapping(
+                {value: i for i, value in enumerate(surrogates['values'])}, generator)
+        else:
+            mapping = data.get('mapping', {})
+        kept_values = data.get('kept_values')
+        return cls(data['kind'], data.get('category'), mapping,
+                   data.get('variation_percent', DEFAULT_VARIATION_PERCENT),
+                   data.get('surrogate_key'), data.get('next_ordinal', 0),
+                   data.get('reason'), data.get('date_shift'), data.get('date_format'),
+                   frozenset(kept_values) if kept_values is not None else None)
+
+    def is_date(self, value):
+        """Check if a text cell of a 'date' column is a date the plan keeps or shifts."""
+        if self.date_format:
+            return DATE_FORMATS[self.date_format].match(value) is not None
+        return _matches_date(value.strip())
+
+    def shift(self, value):
+        """Return a cell of a 'date' column moved by date_shift days, or unchanged."""
+        if not self.date_shift or not isinstance(value, str):
+            return value
+        shifted_dates = self._shifted_dates
+        shifted = shifted_dates.get(value)
+        if shifted is None:
+            # Each distinct value is parsed once, while the cache lasts
+            formats = (self.date_format,) if self.date_format else None
+            shifted = shift_date(value, self.date_shift, formats) or value
+            if len(shifted_dates) >= DATE_CACHE_SIZE:
+                shifted_dates.clear()
+            shifted_dates[value] = shifted
+        return shifted
+
+    def transform_column(self, values, rng=random, report=None):
+        """
+        Return the obfuscated form of a list of cells of this column.
+
+        Args:
+            values: List of cells, or a NumericColumn already parsed from them
+            rng: Random number source for the numeric noise
+            report: Optional RunReport to time the stages in
+
+        Returns:
+            values itself for 'passthrough' columns, otherwise a NumericColumn
+            holding the randomized numbers and the replaced text
+        """
+        if self.kind == 'passthrough':
+            return values
+        report = report if report is not None else NULL_REPORT
+        mapping = self.mapping
+        if self.kind == 'date' and self.date_format == 'epoch':
+            # Epoch seconds are numbers, but they are shifted, not randomized
+            with report.stage('dates'):
+                return [mapping[value] if value in mapping else self.shift(value)
+                        for value in values]
+        with report.stage('numeric'):
+            if not isinstance(values, NumericColumn):
+                values = NumericColumn.parse(values)
+            column = values.randomize(self.variation_percent, rng)
+        if self.kind == 'words' or mapping:
+            with report.stage('remap'):
+                # Only the text cells can be keys of the mapping
+                column.text = [mapping.get(value, value) for value in column.text]
+        if self.kind == 'date' and self.date_shift:
+            with report.stage('dates'):
+                column.text = [self.shift(value) for value in column.text]
+        return column
+
+class DictionaryColumn(object):
+    """
+    A column stored as integer codes into the list of its distinct values.
+
+    Low-cardinality text columns (departments, countries, statuses) are much
+    cheaper this way: detection runs once per distinct value, and replacing
+    values only rewrites the dictionary.
+
+    Attributes:
+        codes: array('I') with one code per cell
+        values: List of distinct values, indexed by code
+    """
+
+    def __init__(self, codes, values):
+        self.codes = codes
+        self.values = values
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def encode(cls, column, max_ratio=None, probe=4096):
+        """
+        Dictionary-encode a column.
+
+        Args:
+            column: Iterable of cell values
+            max_ratio: If set, give up once the distinct values exceed this
+                fraction of the cells seen (checked after the first probe cells)
+            probe: Number of cells seen before max_ratio applies
+
+        Returns:
+            A DictionaryColumn, or None if the column is not low-cardinality
+        """
+        index = {}
+        values = []
+        codes = array('I')
+        for n, value in enumerate(column, 1):
+            code = index.get(value)
+            if code is None:
+                code = len(values)
+                if max_ratio is not None and code >= max_ratio * max(n, probe):
+                    return None
+                index[value] = code
+                values.append(value)
+            codes.append(code)
+        return cls(codes, values)
+
+    def items(self):
+        """Return (value, count) pairs for every distinct value."""
+        counts = Counter(self.codes)
+        return [(value, counts[code]) for code, value in enumerate(self.values)]
+
+    def remap(self, mapping):
+        """Return a column with the same codes and the dictionary values replaced."""
+        return DictionaryColumn(self.codes, [mapping.get(v, v) for v in self.values])
+
+    def decode(self):
+        """Return the column as a list of values."""
+        values = self.values
+        return [values[code] for code in self.codes]
+
+class NumericColumn(object):
+    """
+    A column whose numeric cells are parsed once into typed arrays.
+
+    Numeric cells are held unboxed, with the number of decimal places of
+    their original text, and a bitmap tells them apart from the other cells
+    (text, empty or missing), which are kept in order in a list. Randomized
+    columns are turned back into Python values only when iterated, i.e. as
+    the rows are written.
+
+    Attributes:
+        length: Number of cells
+        mask: bytearray bitmap with bit k set when cell k is numeric
+        values: array('d') of the numeric cells; array('q') in randomized
+            columns whose numeric cells are all integers
+        decimals: array('b') of decimal places per numeric cell: -1 for
+            integers, -2 for floats written without a '.'
+        text: List of the non-numeric cells
+    """
+
+    def __init__(self, length, mask, values, decimals, text):
+        self.length = length
+        self.mask = mask
+        self.values = values
+        self.decimals = decimals
+        self.text = text
+
+    def __len__(self):
+        return self.length
+
+    @classmethod
+    def parse(cls, column, profiler=None):
+        """
+        Parse the numeric cells of a column.
+
+        Args:
+            column: Sequence of cell values
+            profiler: Optional ColumnProfiler to record every cell in, so that
+                profiling does not parse the cells a second time
+
+        Returns:
+            A NumericColumn
+        """
+        # Every bit starts set; those of non-numeric cells are cleared
+        mask = bytearray(b'\xff') * ((len(column) + 7) >> 3)
+        values = array('d')
+        decimals = array('b')
+        text = []
+        numeric_cells = [] if profiler is not None else None
+        # Bound methods, as this loop runs once per cell
+        append_value = values.append
+        append_places = decimals.append
+        append_text = text.append
+        for k, value in enumerate(column):
+            try:
+                append_value(float(value))
+            except (ValueError, TypeError):
+                mask[k >> 3] ^= 1 << (k & 7)
+                append_text(value)
+                continue
+            original_str = value if isinstance(value, str) else str(value)
+            if original_str.isdigit() or isinstance(value, int):
+                append_places(-1)
+            else:
+                point = original_str.find('.')
+                if point == -1:
+                    append_places(-2)
+                else:
+                    places = len(original_str) - point - 1
+                    append_places(places if places < 128 else 127)
+            if numeric_cells is not None:
+                numeric_cells.append(value)
+        if profiler is not None:
+            for value in text:
+                profiler.add(value, 1, False)
+            profiler.add_numbers(numeric_cells)
+        return cls(len(column), mask, values, decimals, text)
+
+    def randomize(self, variation_percent=DEFAULT_VARIATION_PERCENT, rng=random):
+        """
+        Return a column with every numeric cell randomized.
+
+        Applies the rules of randomize_numeric_value: integers stay integers
+        and decimals are rounded to their original number of places. The
+        text cells are shared with this column.
+        """
+        randomized = _randomize_array(self.values, variation_percent / 100, rng)
+        decimals = self.decimals
+        values = None
+        if decimals.count(-1) == len(decimals):
+            try:
+                values = array('q', [round(v) for v in randomized])
+            except OverflowError:
+                pass
+        if values is None:
+            values = array('d', [v if places == -2 else round(v) if places == -1 else
+                                 round(v, places)
+                                 for v, places in zip(randomized, decimals)])
+        return NumericColumn(self.length, self.mask, values, decimals, self.text)
+
+    def _numbers(self):
+        values = self.values
+        if values.typecode == 'q' or -1 not in self.decimals:
+            return iter(values)
+        return (int(v) if places == -1 else v for v, places in zip(values, self.decimals))
+
+    def _cells(self, numbers):
+        text = iter(self.text)
+        mask = self.mask
+        for k in range(self.length):
+            yield next(numbers) if mask[k >> 3] >> (k & 7) & 1 else next(text)
+
+    def __iter__(self):
+        """Iterate over the cells, numbers as int or float."""
+        if not self.values:
+            return iter(self.text)
+        numbers = self._numbers()
+        if len(self.values) == self.length:
+            return numbers
+        return self._cells(numbers)
+
+def obfuscate_column(column, variation_percent=DEFAULT_VARIATION_PERCENT, rng=random,
+                     mapping_store=None, domain=None, report=None, treatment=None,
+                     date_shift=None):
+    """
+    Obfuscate a whole column: randomize numeric cells and replace text values.
+    
+    Low-cardinality columns are dictionary-encoded so that classification
+    and replacement cost one step per distinct value plus a pass over the
+    codes; other columns are profiled cell by cell while their numeric
+    cells are parsed (see NumericColumn).
     
     Args:
-        input_file: Path to the input CSV file
-        output_file: Path to the output CSV file
-        seed: Optional random seed for reproducibility
+        column: Sequence of cell values
+        variation_percent: Percentage range for numeric randomization
+        rng: Random number source for the numeric noise
+        mapping_store: Optional MappingStore to reuse and record mappings in
+        domain: Mapping domain in the store (normally the column name)
+        report: Optional RunReport to time the stages and record the column in
+        treatment: Optional schema treatment of the column (see load_schema),
+            which replaces type inference
+        date_shift: Optional maximum number of days the dates of a date
+            column are shifted by
+        
+    Returns:
+        The obfuscated column as an iterable of cells (a list or a
+        NumericColumn), or None if the schema drops it
     """
-    if seed is not None:
-        random.seed(seed)
+    report = report if report is not None else NULL_REPORT
+    if treatment is not None and not _needs_profile(treatment):
+        plan = schema_plan(treatment, variation_percent, date_shift=date_shift)
+        report.add_column(domain, plan)
+        if plan.kind == 'drop':
+            return None
+        return plan.transform_column(list(column), rng, report)
+
+    profiler = ColumnProfiler()
+    with report.stage('classify'):
+        encoded = DictionaryColumn.encode(column, max_ratio=0.5)
+        if encoded is None:
+            numbers = NumericColumn.parse(column, profiler)
+        else:
+            profiler.update_counts(encoded.items())
+        if treatment is None:
+            plan = profiler.plan(variation_percent, mapping_store, domain, date_shift)
+        else:
+            plan = schema_plan(treatment, variation_percent, profiler, mapping_store, domain,
+                               date_shift)
+    report.add_column(domain, plan, profiler)
+
+    if encoded is None:
+        return plan.transform_column(numbers, rng, report)
+
+    with report.stage('remap'):
+        if plan.kind == 'words':
+            encoded = encoded.remap(plan.mapping)
+        elif plan.kind == 'date' and plan.date_shift:
+            # One shift per distinct date
+            encoded = DictionaryColumn(encoded.codes, [plan.shift(v) for v in encoded.values])
+        values = encoded.decode()
+    if profiler.numeric:
+        # Every numeric cell gets its own noise, so these are done per cell
+        with report.stage('numeric'):
+            values = NumericColumn.parse(values).randomize(variation_percent, rng)
+    return values
+
+def transform_chunk(plans, rows, rng=random, report=None):
+    """
+    Obfuscate a chunk of rows column by column.
     
-    try:
-        # Read the input CSV file
-        with open(input_file, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            header = next(reader)
-            data = list(reader)
-        
-        # Step 1: Randomize numeric values
-        for i in range(len(data)):
-            for j in range(len(data[i])):
-                if is_numeric(data[i][j]):
-                    data[i][j] = randomize_numeric_value(data[i][j])
-        
-        # Step 2: Replace unique values with meaningful English words
-        data = replace_unique_values(data)
+    Args:
+        plans: One ColumnPlan per column
+        rows: List of rows (lists of cell values)
+        rng: Random number source for the numeric noise
+        report: Optional RunReport to time the stages in
         
-        # Write the obfuscated data to the output file
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
-            writer.writerows(data)
-            
-        print(f"CSV obfuscation complete. Output saved to {output_file}")
-        return True
-    except Exception as e:
-        print(f"Error obfuscating CSV: {e}")
-        return False
+    Returns:
+        The obfuscated rows; cells beyond the planned columns, and those of
+        columns planned as 'drop', are left out
+    """
+    width = len(plans)
+    columns = [None if plan.kind == 'drop' else
+               plan.transform_column([row[i] if i < len(row) else None for row in rows],
+                                     rng, report)
+               for i, plan in enumerate(plans)]
+    if all(len(row) == width for row in rows):
+        return list(zip(*[column for column in columns if column is not None]))
+    columns = [None if column is None else list(column) for column in columns]
+    return [[column[r] for column in columns[:len(row)] if column is not None]
+            for r, row in enumerate(rows)]
 
-def main():
-    """Main function to handle command line arguments."""
-    parser = argparse.ArgumentParser(description='Obfuscate CSV files.')
-    parser.add_argument('input', help='Input CSV file')
-    parser.add_argument('output', help='Output CSV file')
-    parser.add_argument('--seed', type=int, help='Random seed for reproducibility')
-    
-    args = parser.parse_args()
-    
-    return obfuscate_csv(args.input, args.output, args.seed)
+def _z_score(confidence):
+    """Two-sided standard normal quantile for the given confidence level."""
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+def _wilson_interval(hits, n, z):
+    """Wilson score interval for a proportion of hits out of n."""
+    p = hits / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return centre - margin, centre + margin
+
+class SurrogateGenerator(object):
+    """
+    Collision-free generator of composite surrogate words such as 'Tiger-Coral-17'.
+
+    Index i is passed through a keyed permutation (a Feistel network with
+    cycle walking) of range(capacity) and the result is spelled as a word
+    from the column's category, a word from a secondary category and a
+    number. Distinct indexes therefore always give distinct surrogates, and
+    any surrogate can be computed on demand in constant memory. Indexes past
+    the capacity continue in further blocks, each with its own permutation
+    and a disjoint range of numbers, so a mapping can keep growing.
+
+    Args:
+        category: Word category (see get_words) for the first word
+        size: Number of distinct values that need a surrogate
+        key: Integer key of the permutation
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, category, size, key):
+        secondary = 'animals' if category == 'colors' else 'colors'
+        # Duplicates would break uniqueness; the secondary list has no
+        # hyphens, so every surrogate parses back unambiguously from the right
+        self.words = _unique_words(get_words(category))
+        self.secondary = _unique_words(get_words(secondary))
+        base = len(self.words) * len(self.secondary)
+        self.numbers = max(1, -(-size // base))
+        self.capacity = base * self.numbers
+        self.size = size
+        self.key = key
+
+        bits = max(2, (self.capacity - 1).bit_length())
+        bits += bits & 1
+        self._half = bits // 2
+        self._mask = (1 << self._half) - 1
+        self._block_keys = {}
+
+    def _round_keys(self, block):
+        round_keys = self._block_keys.get(block)
+        if round_keys is None:
+            key_rng = random.Random(self.key if block == 0 else f'{self.key}:{block}')
+            round_keys = [key_rng.getrandbits(64) | 1 for _ in range(self.ROUNDS)]
+            self._block_keys[block] = round_keys
+        return round_keys
+
+    def _permute(self, x, round_keys):
+        half, mask = self._half, self._mask
+        capacity = self.capacity
+        while True:
+            left, right = x >> half, x & mask
+            for round_key in round_keys:
+                # Keyed multiply-xorshift round function
+                y = (right * round_key + (round_key >> 32)) & 0xFFFFFFFFFFFFFFFF
+                y = ((y ^ (y >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+                left, right = right, left ^ ((y ^ (y >> 31)) & mask)
+            x = (left << half) | right
+            # Cycle walking keeps the permutation within range(capacity)
+            if x < capacity:
+                return x
+
+    def __getitem__(self, index):
+        if index < 0:
+            raise IndexError('surrogate index out of range')
+        block, index = divmod(index, self.capacity)
+        rest, first = divmod(self._permute(index, self._round_keys(block)), len(self.words))
+        number, second = divmod(rest, len(self.secondary))
+        return f'{self.words[first]}-{self.secondary[second]}-{block * self.numbers + number + 1}'
+
+def _unique_words(words):
+    # Word files are expected to be unique already and are not loaded
+    return words if isinstance(words, WordList) else list(dict.fromkeys(words))
+
+class SurrogateMapping(object):
+    """
+    Read-only value -> surrogate mapping computed on demand.
+
+    Only the ordinal of each distinct value is stored; the surrogate strings
+    themselves are produced by a SurrogateGenerator when looked up. The
+    value -> ordinal dict still holds every distinct original value, so its
+    memory grows with the cardinality of the column.
+    """
+
+    def __init__(self, index, generator):
+        self.index = index
+        self.generator = generator
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __contains__(self, value):
+        return value in self.index
+
+    def __getitem__(self, value):
+        return self.generator[self.index[value]]
+
+    def get(self, value, default=None):
+        ordinal = self.index.get(value)
+        if ordinal is None:
+            return default
+        return self.generator[ordinal]
+
+def build_word_mapping(values, category, rng=random):
+    """
+    Map each distinct value to a replacement from a word category.
+
+    Args:
+        values: Distinct values to map
+        category: Word category (see get_words) to draw replacements from
+        rng: Random number source (default: the global random module)
+
+    Returns:
+        A dict of original value -> replacement word when the category has
+        enough words, otherwise a SurrogateMapping of unique composite words
+    """
+    # Built-in lists repeat a few words; sampling them could give two
+    # values the same replacement
+    word_list = _unique_words(get_words(category))
+    if len(values) > len(word_list):
+        # More unique values than words: use collision-free composite words
+        values = values if isinstance(values, dict) else list(values)
+        generator = SurrogateGenerator(category, len(values), rng.getrandbits(64))
+        return SurrogateMapping({value: i for i, value in enumerate(values)}, generator)
+    # Otherwise, we'll use a random sample of words
+    values = list(values)
+    return dict(zip(values, rng.sample(word_list, len(values))))
+
+class MappingStore(object):
+    """
+    Persistent (domain, original value) -> replacement mappings.
+
+    Mappings are kept in a local SQLite file so the same value gets the same
+    replacement in every file and every run that uses the store. The domain
+    is normally the column name. Lookups go through an in-memory LRU cache of
+    hot values first.
+
+    Each domain also records its word category and the key of its surrogate
+    generator, so values added in later runs are assigned consistently.
+
+    Args:
+        path: Path to the SQLite database (created if missing)
+        cache_size: Number of lookups kept in the LRU cache
+    """
+
+    def __init__(self, path, cache_size=DEFAULT_MAPPING_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._conn = None
+        self._pid = None
+
+    def __getstate__(self):
+        # Connections cannot be shared with worker processes; they reopen it
+        return {'path': self.path, 'cache_size': self.cache_size}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['cache_size'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def conn(self):
+        """The SQLite connection, opened lazily (and reopened after a fork)."""
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path)
+            self._pid = os.getpid()
+            self._conn.executescript(
+                'CREATE TABLE IF NOT EXISTS mappings ('
+                ' domain TEXT NOT NULL, original TEXT NOT NULL, replacement TEXT NOT NULL,'
+                ' PRIMARY KEY (domain, original)) WITHOUT ROWID;'
+                'CREATE INDEX IF NOT EXISTS mappings_replacement ON mappings (domain, replacement);'
+                'CREATE TABLE IF NOT EXISTS domains ('
+                ' domain TEXT PRIMARY KEY, category TEXT NOT NULL, surrogate_key INTEGER NOT NULL,'
+                ' surrogate_size INTEGER NOT NULL, next_ordinal INTEGER NOT NULL);'
+            )
+        return self._conn
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    def lookup(self, domain, value):
+        """Return the stored replacement of value in domain, or None."""
+        key = (domain, value)
+        cache = self._cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        row = self.conn.execute(
+            'SELECT replacement FROM mappings WHERE domain = ? AND original = ?',
+            (domain, value)).fetchone()
+        replacement = row[0] if row else None
+        cache[key] = replacement
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return replacement
+
+    def lookup_many(self, domain, values):
+        """Return a dict of the stored replacements for an iterable of values."""
+        found = {}
+        values = list(values)
+        for start in range(0, len(values), 500):
+            batch = values[start:start + 500]
+            query = ('SELECT original, replacement FROM mappings WHERE domain = ? '
+                     'AND original IN (%s)' % ','.join('?' * len(batch)))
+            found.update(self.conn.execute(query, [domain] + batch))
+        return found
+
+    def _used_replacements(self, domain, words):
+        """Return the set of words that are already replacements in domain."""
+        used = set()
+        words = list(words)
+        for start in range(0, len(words), 500):
+            batch = words[start:start + 500]
+            query = ('SELECT replacement FROM mappings WHERE domain = ? '
+                     'AND replacement IN (%s)' % ','.join('?' * len(batch)))
+            used.update(replacement for replacement, in self.conn.execute(query, [domain] + batch))
+        return used
+
+    def domain_stats(self, domain):
+        """Return (mapping size, collisions) for a domain."""
+        size, distinct = self.conn.execute(
+            'SELECT COUNT(*), COUNT(DISTINCT replacement) FROM mappings WHERE domain = ?',
+            (domain,)).fetchone()
+        return size, size - distinct
+
+    def assign(self, domain, category, values, rng=random):
+        """
+        Make sure every value of a column has a replacement in domain.
+
+        Values already in the store keep their replacement. New values get
+        unused words from the domain's category while they last, otherwise
+        unique surrogates from the domain's SurrogateGenerator.
+
+        Args:
+            domain: Mapping domain (normally the column name)
+            category: Word category detected for the column; ignored if the
+                domain already has one
+            values: Distinct original values of the column
+            rng: Random number source for new domains and replacements
+
+        Returns:
+            A StoreMapping for the domain
+        """
+        conn = self.conn
+        values = [value for value in values if isinstance(value, str)]
+        row = conn.execute(
+            'SELECT category, surrogate_key, surrogate_size, next_ordinal FROM domains '
+            'WHERE domain = ?', (domain,)).fetchone()
+        if row is None:
+            row = (category, rng.getrandbits(63), len(values), 0)
+            conn.execute('INSERT INTO domains VALUES (?, ?, ?, ?, ?)', (domain,) + row)
+        category, surrogate_key, surrogate_size, next_ordinal = row
+
+        existing = self.lookup_many(domain, values)
+        new_values = [value for value in values if value not in existing]
+        if new_values:
+            replacements = None
+            if next_ordinal == 0:
+                used_count, = conn.execute('SELECT COUNT(*) FROM mappings WHERE domain = ?',
+                                           (domain,)).fetchone()
+                replacements = sample_free_words(
+                    get_words(category), len(new_values),
+                    partial(self._used_replacements, domain), used_count, rng)
+            if replacements is None:
+                generator = SurrogateGenerator(category, surrogate_size, surrogate_key)
+                replacements = [generator[next_ordinal + i] for i in range(len(new_values))]
+                conn.execute('UPDATE domains SET next_ordinal = ? WHERE domain = ?',
+                             (next_ordinal + len(new_values), domain))
+            conn.executemany('INSERT INTO mappings VALUES (?, ?, ?)',
+                             [(domain, value, replacement)
+                              for value, replacement in zip(new_values, replacements)])
+            # Earlier lookups of these values cached a miss; replace it
+            cache = self._cache
+            for value, replacement in zip(new_values, replacements):
+                if (domain, value) in cache:
+                    cache[(domain, value)] = replacement
+        conn.commit()
+        return StoreMapping(self, domain, category)
+
+class StoreMapping(object):
+    """Read-only mapping view of one domain of a MappingStore."""
+
+    def __init__(self, store, domain, category=None):
+        self.store = store
+        self.domain = domain
+        self.category = category
+
+    def __contains__(self, value):
+        return self.store.lookup(self.domain, value) is not None
+
+    def __getitem__(self, value):
+        replacement = self.store.lookup(self.domain, value)
+        if replacement is None:
+            raise KeyError(value)
+        return replacement
+
+    def get(self, value, default=None):
+        if not isinstance(value, str):
+            return default
+        replacement = self.store.lookup(self.domain, value)
+        return default if replacement is None else replacement
+
+class ColumnProfiler(object):
+    """
+    Fused single-pass profiler for one column.
+
+    Each cell is parsed once: numeric cells only update counters, and the
+    distinct text values are kept with their counts. The date, boolean and
+    category checks of is_date_column, is_boolean_column and
+    detect_column_type are then evaluated once per distinct value with the
+    precompiled patterns, giving the same classifications as those functions.
+
+    When sample_size is set, a reservoir sample of the column is also kept so
+    that numeric and date columns can be decided early (see sample_decision).
+    The sample only covers the rows seen so far, so the cells read after an
+    early decision are still checked against it (see contradicts).
+    """
+
+    def __init__(self, sample_size=0, confidence=0.999):
+        self.non_empty = 0
+        self.numeric = 0
+        # Numeric cells that detect_column_type would see (it drops falsy values)
+        self.numeric_typed = 0
+        self.numeric_len_total = 0
+        self.numeric_len_max = 0
+        # Lowercased distinct values, capped at 3 for the boolean check
+        self.lowered = set()
+        self.counts = Counter()
+        self.sample_size = sample_size
+        self.confidence = confidence
+        self.sample = []
+        self.decision = None
+        self.decided_from = 0
+        # Layout of a column frozen as 'date', read from its sample
+        self.frozen_date_format = None
+        # Set when later cells ruled out the early decision
+        self.contradicted = False
+        self._seen = 0
+        # Private generator so sampling never disturbs the seeded global state
+        self._sample_rng = random.Random(0)
+
+    def add(self, value, count=1, numeric=None):
+        """
+        Record count cells of this column holding value.
+
+        numeric tells whether value is numeric when the caller has already
+        parsed it (see NumericColumn.parse); otherwise it is checked here.
+        """
+        if value is None or value == '':
+            return
+        self.non_empty += count
+        text = value if isinstance(value, str) else str(value)
+        if len(self.lowered) < 3:
+            self.lowered.add(text.strip().lower())
+
+        if self.sample_size:
+            for _ in range(count):
+                self._seen += 1
+                if len(self.sample) < self.sample_size:
+                    self.sample.append(text)
+                else:
+                    slot = self._sample_rng.randrange(self._seen)
+                    if slot < self.sample_size:
+                        self.sample[slot] = text
+
+        if numeric is None:
+            numeric = is_numeric(value)
+        if numeric:
+            self.numeric += count
+            if value:
+                length = len(text.strip())
+                self.numeric_typed += count
+                self.numeric_len_total += length * count
+                if length > self.numeric_len_max:
+                    self.numeric_len_max = length
+        else:
+            self.counts[value] += count
+
+    def add_numbers(self, values):
+        """Record cells already known to be numeric (see NumericColumn.parse)."""
+        if self.sample_size:
+            for value in values:
+                self.add(value, 1, True)
+            return
+        self.non_empty += len(values)
+        self.numeric += len(values)
+        for value in values:
+            if len(self.lowered) >= 3:
+                break
+            self.lowered.add(str(value).strip().lower())
+        # Falsy values (a 0 int) are left out, as in add
+        lengths = [len(value.strip() if isinstance(value, str) else str(value).strip())
+                   for value in values if value]
+        if not lengths:
+            return
+        self.numeric_typed += len(lengths)
+        self.numeric_len_total += sum(lengths)
+        self.numeric_len_max = max(self.numeric_len_max, max(lengths))
+
+    def update(self, values):
+        """Record every cell of an iterable of values."""
+        for value in values:
+            self.add(value)
+
+    def update_counts(self, items):
+        """Record (value, count) pairs, e.g. from DictionaryColumn.items()."""
+        for value, count in items:
+            self.add(value, count)
+
+    def sample_decision(self):
+        """
+        Decide the column kind from the reservoir sample alone.
+
+        Returns:
+            'numeric' or 'date' when the Wilson interval of the matching ratio
+            lies entirely above the 70% threshold at the configured confidence,
+            otherwise None (the full statistics are needed)
+        """
+        if self.decision is not None:
+            return self.decision
+        n = len(self.sample)
+        if not self.sample_size or not n:
+            return None
+
+        z = _z_score(self.confidence)
+        numeric_hits = sum(1 for v in self.sample if is_numeric(v))
+        low, high = _wilson_interval(numeric_hits, n, z)
+        if low > 0.7:
+            return 'numeric'
+        if high > 0.7:
+            return None
+
+        date_hits = sum(1 for v in self.sample if _matches_date(v.strip()))
+        low, _ = _wilson_interval(date_hits, n, z)
+        if low > 0.7:
+            return 'date'
+        return None
+
+    def contradicts(self, values):
+        """
+        Check if cells read after an early decision rule it out.
+
+        Args:
+            values: Cells of this column from a later chunk (or a sample of them)
+
+        Returns:
+            True when the Wilson interval of their ratio of numeric (or date)
+            cells lies entirely below the 70% threshold at the configured
+            confidence, i.e. the decision does not hold for that part of the file
+        """
+        values = [value for value in values if value is not None and value != '']
+        if not values:
+            return False
+        if self.decision == 'numeric':
+            hits = sum(1 for value in values if is_numeric(value))
+        else:
+            hits = sum(1 for value in values if _matches_date(str(value).strip()))
+        _, high = _wilson_interval(hits, len(values), _z_score(self.confidence))
+        return high < 0.7
+
+    def merge(self, other):
+        """
+        Fold the statistics of another profiler of the same column into this one.
+
+        Merging the profilers of consecutive chunks in input order gives the
+        same counts, in the same first-seen order, as profiling the whole
+        column at once. Reservoir samples are not merged.
+        """
+        self.non_empty += other.non_empty
+        self.numeric += other.numeric
+        self.numeric_typed += other.numeric_typed
+        self.numeric_len_total += other.numeric_len_total
+        self.numeric_len_max = max(self.numeric_len_max, other.numeric_len_max)
+        self.lowered |= other.lowered
+        self.counts.update(other.counts)
+
+    def freeze(self, decision):
+        """Fix the column kind and drop the statistics no longer needed."""
+        self.decision = decision
+        self.decided_from = len(self.sample)
+        if decision == 'date':
+            self.frozen_date_format = detect_date_format(self.sample)
+        self.counts = Counter()
+        self.sample = []
+
+    def is_numeric_column(self):
+        return self.numeric / max(1, self.non_empty) > 0.7
+
+    def date_ratio(self):
+        if not self.non_empty:
+            return 0.0
+        # Numeric cells never match the inferred formats, so only text is checked
+        date_count = sum(count for value, count in self.counts.items()
+                         if _matches_date(str(value).strip()))
+        return date_count / self.non_empty
+
+    def is_date_column(self):
+        # Numeric cells never match the inferred formats; stop once decided
+        return _exceeds_ratio(self.counts.items(), self.non_empty - self.numeric,
+                              self.non_empty, lambda v: _matches_date(str(v).strip()), 0.7)
+
+    def is_boolean_column(self):
+        return 0 < len(self.lowered) < 3
+
+    def detect_column_type(self):
+        """Weighted equivalent of detect_column_type over the profiled cells."""
+        return self._detect_category()[0]
+
+    def _detect_category(self):
+        """Return the (category, reason) chosen for a 'words' column."""
+        stripped = [(str(value).strip(), count) for value, count in self.counts.items()]
+        total = self.numeric_typed + sum(count for _, count in stripped)
+        if not total:
+            return 'names', 'no values to analyse'
+
+        # The 'products' branch for mostly numeric values cannot fire here:
+        # is_numeric accepts everything NUMERIC_PATTERN does, and columns over
+        # the numeric threshold have already been classified as numeric.
+        max_len = max([self.numeric_len_max] + [len(v) for v, _ in stripped])
+        if all(len(v.split()) <= 2 for v, _ in stripped) and max_len < 20:
+            return 'names', 'values have at most 2 words and fewer than 20 characters'
+
+        if all(len(v.split()) <= 3 for v, _ in stripped):
+            return 'countries', 'values have at most 3 words'
+
+        if any('@' in v for v, _ in stripped):
+            return 'names', "values contain '@' (emails)"
+
+        if any(DATE_LIKE_PATTERN.search(v) for v, _ in stripped):
+            return 'fruits', 'values contain date-like text'
+
+        if any(CURRENCY_PATTERN.search(v) for v, _ in stripped):
+            return 'products', 'values contain currency symbols'
+
+        if any(ADDRESS_PATTERN.search(v) for v, _ in stripped):
+            return 'cities', 'values look like addresses'
+
+        total_len = self.numeric_len_total + sum(len(v) * count for v, count in stripped)
+        avg_len = total_len / total
+        return _category_for_length(avg_len), f'average length is {avg_len:.1f} characters'
+
+    def explain(self, kind):
+        """Return a short explanation of why the column was classified as kind."""
+        if self.decision is not None:
+            return (f'decided from a sample of {self.decided_from} values '
+                    f'at {self.confidence:.1%} confidence')
+        non_empty = max(1, self.non_empty)
+        if kind == 'numeric':
+            return (f'{self.numeric / non_empty:.0%} of {self.non_empty} non-empty values '
+                    'are numeric (over 70%)')
+        if kind == 'date':
+            return (f'{self.date_ratio():.0%} of {self.non_empty} non-empty values '
+                    'match a date pattern (over 70%)')
+        if kind == 'boolean':
+            return f'{len(self.lowered)} distinct value(s) (fewer than 3)'
+        return 'not numeric, date or boolean; ' + self._detect_category()[1]
+
+    def classify(self):
+        """Return the column kind: 'numeric', 'date', 'boolean' or 'words'."""
+        if self.decision is not None:
+            return self.decision
+        if self.is_numeric_column():
+            return 'numeric'
+        if self.is_date_column():
+            return 'date'
+        if self.is_boolean_column():
+            return 'boolean'
+        return 'words'
+
+    def plan(self, variation_percent=DEFAULT_VARIATION_PERCENT, mapping_store=None,
+             domain=None, date_shift=None, rng=random):
+        """
+        Build the ColumnPlan for this column.
+
+        Args:
+            variation_percent: Percentage range for numeric randomization
+            mapping_store: Optional MappingStore to reuse and record mappings in
+            domain: Mapping domain in the store (normally the column name)
+            date_shift: Optional maximum number of days the dates of a date
+                column are shifted by
+            rng: Random number source for the date offset and the mapping
+        """
+        kind = self.classify()
+        if kind == 'date':
+            date_shift = _pick_date_shift(date_shift, rng)
+            date_format = None
+            if date_shift:
+                # One layout for the whole column, so day-first and
+                # month-first values are never read differently
+                date_format = (self.frozen_date_format if self.decision is not None
+                               else detect_date_format(self.counts))
+            return ColumnPlan(kind, variation_percent=variation_percent,
+                              reason=self.explain(kind), date_shift=date_shift,
+                              date_format=date_format)
+        if kind == 'boolean':
+            return ColumnPlan(kind, variation_percent=variation_percent,
+                              reason=self.explain(kind),
+                              kept_values=frozenset(value for value in self.counts
+                                                    if isinstance(value, str)))
+        if kind != 'words':
+            return ColumnPlan(kind, variation_percent=variation_percent,
+                              reason=self.explain(kind))
+        category, reason = self._detect_category()
+        reason = 'not numeric, date or boolean; ' + reason
+        if mapping_store is not None:
+            mapping = mapping_store.assign(domain, category, self.counts, rng)
+            return ColumnPlan('words', mapping.category, mapping, variation_percent,
+                              reason=reason)
+        mapping = build_word_mapping(self.counts, category, rng)
+        return ColumnPlan('words', category, mapping, variation_percent, reason=reason)
+
+def column_domain(header, index):
+    """Mapping domain of a column: its header name, or its position if unnamed."""
+    if index < len(header) and header[index]:
+        return header[index]
+    return f'column_{index + 1}'
+
+def load_schema(schema):
+    """
+    Return the column treatments of a schema given as a dict or a JSON file path.
+
+    A schema maps header names to treatments, either at the top level or
+    under a "columns" key. A treatment is a type name, or a dict with a
+    "type" and its options:
+
+        passthrough - copy the cells unchanged, with no per-cell checks
+        numeric     - randomize numeric cells; option "variation" (percent)
+        words       - replace text with category words; option "category"
+        surrogate   - replace text with unique composite words; option "category"
+        drop        - leave the column out of the output
+        date        - keep dates, or shift them; option "shift" (days, the
+                      default is the date_shift of the run) and option
+                      "format" (a DATE_FORMATS name, e.g. "epoch" for Unix
+                      seconds, which are never inferred)
+
+    Columns named in the schema skip type inference. Names that are not in
+    a file's header are ignored, so one schema can serve several files.
+
+    Returns:
+        A dict of column name -> treatment dict
+    """
+    if schema is None:
+        return {}
+    if not isinstance(schema, dict):
+        with open(schema, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+    columns = schema['columns'] if isinstance(schema.get('columns'), dict) else schema
+    treatments = {}
+    for name, treatment in columns.items():
+        treatment = {'type': treatment} if isinstance(treatment, str) else dict(treatment)
+        kind = treatment.get('type')
+        if kind not in SCHEMA_TYPES:
+            raise ValueError(f"schema column '{name}' has unknown type {kind!r} "
+                             f"(expected one of {', '.join(SCHEMA_TYPES)})")
+        if kind == 'date' and treatment.get('format', 'ymd') not in DATE_FORMATS:
+            raise ValueError(f"schema column '{name}' has unknown date format "
+                             f"{treatment['format']!r} (expected one of "
+                             f"{', '.join(DATE_FORMATS)})")
+        if kind == 'date' and not isinstance(treatment.get('shift', 0), int):
+            raise ValueError(f"schema column '{name}' has a date shift that is not a "
+                             f"whole number of days: {treatment['shift']!r}")
+        if kind in ('words', 'surrogate'):
+            treatment.setdefault('category', 'names')
+            if not has_category(treatment['category']):
+                raise ValueError(f"schema column '{name}' has unknown category "
+                                 f"{treatment['category']!r}")
+        treatments[name] = treatment
+    return treatments
+
+def column_treatments(schema, header):
+    """Return a dict of column index -> schema treatment for the columns of header."""
+    treatments = load_schema(schema)
+    return {i: treatments[name] for i, name in enumerate(header) if name in treatments}
+
+def _needs_profile(treatment):
+    # Word columns from a schema are still scanned for their distinct values
+    return treatment is None or treatment['type'] in ('words', 'surrogate')
+
+def schema_plan(treatment, variation_percent=DEFAULT_VARIATION_PERCENT, profiler=None,
+                mapping_store=None, domain=None, date_shift=None, rng=random):
+    """
+    Build the ColumnPlan for a column with a schema treatment.
+
+    Args:
+        treatment: Treatment dict from load_schema
+        variation_percent: Default percentage range for numeric randomization
+        profiler: ColumnProfiler holding the distinct values of a 'words' or
+            'surrogate' column (values seen later get replacements through
+            ColumnPlan.extend)
+        mapping_store: Optional MappingStore to reuse and record mappings in
+        domain: Mapping domain in the store (normally the column name)
+        date_shift: Maximum number of days dates are shifted by, unless the
+            treatment sets its own
+        rng: Random number source for the date offset and the mapping
+    """
+    kind = treatment['type']
+    variation_percent = treatment.get('variation', variation_percent)
+    reason = 'set by schema'
+    if kind == 'date':
+        return ColumnPlan('date', variation_percent=variation_percent, reason=reason,
+                          date_shift=_pick_date_shift(treatment.get('shift', date_shift), rng),
+                          date_format=treatment.get('format'))
+    if kind in ('passthrough', 'drop', 'numeric'):
+        return ColumnPlan(kind, variation_percent=variation_percent, reason=reason)
+
+    category = treatment['category']
+    values = profiler.counts if profiler is not None else {}
+    if mapping_store is not None:
+        mapping = mapping_store.assign(domain, category, values, rng)
+        return ColumnPlan('words', mapping.category, mapping, variation_percent, reason=reason)
+    if kind == 'surrogate':
+        generator = SurrogateGenerator(category, max(1, len(values)), rng.getrandbits(64))
+        mapping = SurrogateMapping({value: i for i, value in enumerate(values)}, generator)
+    else:
+        mapping = build_word_mapping(values, category, rng)
+    return ColumnPlan('words', category, mapping, variation_percent, reason=reason)
+
+def output_header(header, plans):
+    """Return the header of the obfuscated file, without the dropped columns."""
+    return [name for i, name in enumerate(header)
+            if i >= len(plans) or plans[i].kind != 'drop']
+
+def open_mapping_store(mapping_store):
+    """Return a MappingStore for a path (or an existing store), or None."""
+    if mapping_store is None or isinstance(mapping_store, MappingStore):
+        return mapping_store
+    return MappingStore(mapping_store)
+
+def mapping_stats(mapping):
+    """
+    Return (size, collisions) of a column mapping, where collisions counts the
+    original values that share their replacement with another value.
+    """
+    if isinstance(mapping, SurrogateMapping):
+        # Surrogates are unique by construction
+        return len(mapping), 0
+    if isinstance(mapping, StoreMapping):
+        return mapping.store.domain_stats(mapping.domain)
+    return len(mapping), len(mapping) - len(set(mapping.values()))
+
+def _peak_memory_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+class RunReport(object):
+    """
+    Timings, volumes and column details of one obfuscation run.
+
+    Stages are timed with the stage() context manager; a stage entered
+    several times (e.g. once per chunk or column) accumulates. Each time a
+    stage ends, the hooks are called as hook(stage, wall_seconds,
+    cpu_seconds), so library callers can collect timings without writing a
+    report file. Stages may be timed from several threads (pipelined mode);
+    their CPU time is that of the thread that ran them, and hooks are called
+    from that thread.
+
+    Args:
+        hooks: Optional list of stage callbacks
+    """
+
+    def __init__(self, hooks=None):
+        self.hooks = list(hooks or [])
+        self.mode = None
+        self.input_file = None
+        self.output_file = None
+        self.stages = OrderedDict()
+        self.columns = []
+        self.rows = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.error = None
+        self.wall = None
+        self.cpu = None
+        self._start_wall = None
+        self._start_cpu = None
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """Register a callback called as hook(stage, wall_seconds, cpu_seconds)."""
+        self.hooks.append(hook)
+
+    def start(self, mode, input_file, output_file):
+        self.mode = mode
+        self.input_file = input_file
+        self.output_file = output_file
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as (part of) the named stage."""
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.thread_time() - start_cpu
+            with self._lock:
+                totals = self.stages.setdefault(name, [0.0, 0.0, 0])
+                totals[0] += wall
+                totals[1] += cpu
+                totals[2] += 1
+            for hook in self.hooks:
+                hook(name, wall, cpu)
+
+    def add_column(self, name, plan, profiler=None):
+        """Record the treatment chosen for a column."""
+        column = {
+            'index': len(self.columns),
+            'name': name,
+            'type': plan.kind,
+            'category': plan.category,
+            'reason': plan.reason,
+        }
+        if profiler is not None:
+            column['non_empty'] = profiler.non_empty
+            column['numeric'] = profiler.numeric
+            # Distinct text values; unknown once a sample decision dropped them
+            column['cardinality'] = len(profiler.counts) if profiler.decision is None else None
+        if plan.kind == 'words':
+            column['mapping_size'], column['collisions'] = mapping_stats(plan.mapping)
+        self.columns.append(column)
+
+    def record_error(self, error):
+        """Record an exception that ended the run; call from its except block."""
+        self.error = {
+            'type': type(error).__name__,
+            'message': str(error),
+            'traceback': traceback.format_exc(),
+        }
+
+    def finish(self):
+        if self._start_wall is not None:
+            self.wall = time.perf_counter() - self._start_wall
+            self.cpu = time.process_time() - self._start_cpu
+        if self.output_file and self.output_file != '-' and os.path.isfile(self.output_file):
+            self.bytes_out = os.path.getsize(self.output_file)
+
+    def to_dict(self):
+        """Return the report as a JSON-serializable dict."""
+        return {
+            'mode': self.mode,
+            'input_file': self.input_file,
+            'output_file': self.output_file,
+            'success': self.error is None,
+            'error': self.error,
+            'wall_seconds': self.wall,
+            'cpu_seconds': self.cpu,
+            'rows': self.rows,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'rows_per_sec': self.rows / self.wall if self.wall else None,
+            'bytes_per_sec': self.bytes_in / self.wall if self.wall else None,
+            'peak_memory_kb': _peak_memory_kb(),
+            'stages': [
+                {'stage': name, 'wall_seconds': wall, 'cpu_seconds': cpu, 'calls': calls}
+                for name, (wall, cpu, calls) in self.stages.items()
+            ],
+            'columns': self.columns,
+        }
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+class _NullReport(object):
+    """Stand-in for a RunReport in the per-column helpers when none is given."""
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+    def add_column(self, name, plan, profiler=None):
+        pass
+
+NULL_REPORT = _NullReport()
+
+def is_compressed(path):
+    """Return True if path is read and written through a compressor (see open_text)."""
+    return os.path.splitext(path)[1].lower() in COMPRESSED_OPENERS
+
+def open_text(path, mode='r'):
+    """
+    Open a CSV file for reading or writing text, compressing transparently.
+
+    Files ending in .gz, .bz2 or .xz are decompressed while read and
+    compressed while written, without temporary files. The path '-' stands
+    for stdin or stdout, which are left open.
+
+    Args:
+        path: Path of the file, or '-'
+        mode: 'r', 'w' or 'a'
+    """
+    if path == '-':
+        return _std_stream(mode)
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(path)[1].lower())
+    if opener is None:
+        return open(path, mode, newline='', encoding='utf-8')
+    return opener(path, mode + 't', newline='', encoding='utf-8')
+
+@contextmanager
+def _std_stream(mode):
+    stream = sys.stdin if mode == 'r' else sys.stdout
+    text = io.TextIOWrapper(stream.buffer, encoding='utf-8', newline='')
+    try:
+        yield text
+    finally:
+        if mode != 'r':
+            text.flush()
+        # Leave the underlying stream open
+        text.detach()
+
+def _file_size(path):
+    return 0 if path == '-' else os.path.getsize(path)
+
+def _print_status(message, output_file):
+    # Keep messages out of the data when the output goes to stdout
+    print(message, file=sys.stderr if output_file == '-' else sys.stdout)
+
+def _write_empty_output(output_file):
+    """Create (or truncate) the output of an empty input."""
+    with open_text(output_file, 'w'):
+        pass
+
+def _check_rereadable_input(input_file, mode):
+    if input_file == '-':
+        raise ValueError(f"{mode} mode needs to read the input more than once; "
+                         "stdin can only be read in a single pass")
+
+def _check_seekable_input(input_file, mode):
+    _check_rereadable_input(input_file, mode)
+    if is_compressed(input_file):
+        raise ValueError(f"{mode} mode needs byte offsets into an uncompressed input; "
+                         f"use streaming mode for {input_file}")
+
+def iter_chunks(reader, chunk_size):
+    """Yield lists of at most chunk_size rows from a CSV reader."""
+    while True:
+        chunk = list(itertools.islice(reader, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _timed(items, report, stage):
+    """Yield the items of an iterator, timing each step as stage."""
+    while True:
+        with report.stage(stage):
+            item = next(items, None)
+        if item is None:
+            return
+        yield item
+
+# Sentinel closing the queues of the pipeline threads
+_END = object()
+
+class _Failure(object):
+    """An exception raised in a pipeline thread, passed on to the consumer."""
+
+    def __init__(self, error):
+        self.error = error
+
+def _iter_in_thread(items, maxsize=DEFAULT_QUEUE_SIZE):
+    """
+    Iterate over items in a background thread, through a bounded queue.
+
+    The thread runs at most maxsize items ahead of the consumer. Exceptions
+    raised by the iterator are re-raised in the consumer. Use with
+    contextlib.closing so the thread is stopped if the consumer gives up.
+    """
+    buffer = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                buffer.put(item)
+            buffer.put(_END)
+        except Exception as e:
+            buffer.put(_Failure(e))
+
+    thread = threading.Thread(target=produce, name='csv-reader', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        # Unblock the producer until it notices the stop
+        while thread.is_alive():
+            try:
+                buffer.get(timeout=0.05)
+            except queue.Empty:
+                pass
+
+class _ThreadedWriter(object):
+    """
+    Call write(item) for every put item in a background thread.
+
+    put() blocks while maxsize items are waiting, and re-raises the first
+    error of write. Leaving the context waits for the queued items to be
+    written, unless the context is left by an exception.
+    """
+
+    def __init__(self, write, maxsize=DEFAULT_QUEUE_SIZE):
+        self.write = write
+        self.buffer = queue.Queue(maxsize)
+        self.error = None
+        self.aborted = False
+        self.thread = threading.Thread(target=self._run, name='csv-writer', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.buffer.get()
+            if item is _END:
+                return
+            if self.error is None and not self.aborted:
+                try:
+                    self.write(item)
+                except Exception as e:
+                    self.error = e
+
+    def put(self, item):
+        if self.error is not None:
+            raise self.error
+        self.buffer.put(item)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.aborted = exc_type is not None
+        self.buffer.put(_END)
+        self.thread.join()
+        if self.error is not None and not self.aborted:
+            raise self.error
+
+def build_column_plans(input_file, chunk_size=DEFAULT_CHUNK_SIZE, sample_size=0,
+                       confidence=0.999, variation_percent=DEFAULT_VARIATION_PERCENT,
+                       mapping_store=None, report=None, pipeline=False,
+                       queue_size=DEFAULT_QUEUE_SIZE, schema=None, date_shift=None):
+    """
+    Profile a CSV file in a single streaming pass and build a plan per column.
+
+    Args:
+        input_file: Path to the input CSV file
+        chunk_size: Number of rows held in memory at a time
+        sample_size: Reservoir size per column; when non-zero, columns whose
+            kind can be decided from the sample stop being profiled, and a
+            column whose decision a later chunk contradicts is profiled again
+            in a second scan of the file
+        confidence: Confidence level required for a sample-based decision
+        variation_percent: Percentage range for numeric randomization
+        mapping_store: Optional MappingStore to reuse and record mappings in
+        report: Optional RunReport to time the stages and record the columns in
+        pipeline: Read and parse the chunks in a background thread
+        queue_size: Chunks the background thread may read ahead
+        schema: Optional schema (see load_schema); the columns it names are
+            not inferred, and only word columns among them are scanned
+        date_shift: Optional maximum number of days the dates of each date
+            column are shifted by (one random offset per column)
+
+    Returns:
+        A (header, plans) tuple, with one ColumnPlan per column
+    """
+    report = report if report is not None else NULL_REPORT
+    with report.stage('profile'), open_text(input_file) as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        treatments = column_treatments(schema, header)
+        chunks = iter_chunks(reader, chunk_size)
+        if pipeline:
+            chunks = _iter_in_thread(chunks, queue_size)
+        with closing(chunks):
+            profilers = profile_chunks(chunks, treatments, sample_size, confidence)
+
+    contradicted = [i for i, profiler in enumerate(profilers) if profiler.contradicted]
+    if contradicted:
+        with report.stage('profile'):
+            _profile_columns_again(input_file, chunk_size, profilers, contradicted)
+
+    return header, _plan_columns(header, profilers, variation_percent, mapping_store, report,
+                                 treatments, date_shift)
+
+def profile_chunks(chunks, treatments=None, sample_size=0, confidence=0.999):
+    """
+    Profile chunks of rows into one ColumnProfiler per column.
+
+    Args:
+        chunks: Iterable of lists of rows
+        treatments: Optional {column index: schema treatment}; columns whose
+            treatment needs no profile are not scanned
+        sample_size: Reservoir size per column; when non-zero, columns whose
+            kind can be decided from the sample stop being profiled. Each
+            later chunk is still checked against the decision, using
+            sample_size evenly spaced rows of it, and a column it contradicts
+            is marked as such (the caller profiles it again in full)
+        confidence: Confidence level required for a sample-based decision
+
+    Returns:
+        A list of ColumnProfilers, as long as the widest row
+    """
+    treatments = treatments or {}
+    profilers = []
+    active = []
+    decided = []
+    for chunk in chunks:
+        if decided:
+            checked = chunk[::max(1, len(chunk) // sample_size)]
+            for index, profiler in decided:
+                if profiler.contradicts([row[index] for row in checked if index < len(row)]):
+                    profiler.contradicted = True
+            decided = [(i, p) for i, p in decided if not p.contradicted]
+        for row in chunk:
+            while len(profilers) < len(row):
+                treatment = treatments.get(len(profilers))
+                profiler = ColumnProfiler(sample_size if treatment is None else 0, confidence)
+                if _needs_profile(treatment):
+                    active.append((len(profilers), profiler))
+                profilers.append(profiler)
+            width = len(row)
+            for index, profiler in active:
+                if index < width:
+                    profiler.add(row[index])
+
+        if sample_size:
+            for index, profiler in active:
+                decision = profiler.sample_decision()
+                if decision is not None:
+                    profiler.freeze(decision)
+                    decided.append((index, profiler))
+            active = [(i, p) for i, p in active if p.decision is None]
+    return profilers
+
+def _profile_columns_again(input_file, chunk_size, profilers, indexes):
+    """Replace the profilers of the given columns with full profiles from a new scan."""
+    for index in indexes:
+        profilers[index] = ColumnProfiler()
+    with open_text(input_file) as f:
+        reader = csv.reader(f)
+        next(reader)
+        for chunk in iter_chunks(reader, chunk_size):
+            for index in indexes:
+                profilers[index].update(row[index] for row in chunk if index < len(row))
+
+def _plan_columns(header, profilers, variation_percent, mapping_store, report,
+                  treatments=None, date_shift=None, rng=random):
+    """Build the plan of every profiled column and record it in the report."""
+    plans = []
+    with report.stage('plan'):
+        for i, profiler in enumerate(profilers):
+            domain = column_domain(header, i)
+            treatment = treatments.get(i) if treatments else None
+            if treatment is None:
+                plan = profiler.plan(variation_percent, mapping_store, domain, date_shift, rng)
+            else:
+                if not _needs_profile(treatment):
+                    profiler = None
+                plan = schema_plan(treatment, variation_percent, profiler, mapping_store,
+                                   domain, date_shift, rng)
+            report.add_column(domain, plan, profiler)
+            plans.append(plan)
+    return plans
+
+def extend_plans(plans, rows, variation_percent=DEFAULT_VARIATION_PERCENT, rng=random):
+    """
+    Prepare column plans for rows that were not profiled.
+
+    Text values without a replacement get one (see ColumnPlan.extend), and
+    text in columns beyond the planned ones is replaced with names rather
+    than leaked as is.
+    """
+    width = max([len(row) for row in rows] + [0])
+    while len(plans) < width:
+        plans.append(ColumnPlan('words', 'names', variation_percent=variation_percent,
+                                reason='column first seen after profiling'))
+    for i, plan in enumerate(plans):
+        if plan.kind not in ('passthrough', 'drop'):
+            plan.extend((row[i] for row in rows if i < len(row)), rng)
+
+class ObfuscationPlan(object):
+    """
+    A reusable plan for obfuscating rows in process, without files.
+
+    Built once from sample rows (or a file), or loaded from JSON saved by a
+    previous run, it applies the column plans to any number of batches with
+    no further type inference. Text values missing from the sample get new
+    replacements as they appear, and keep them for the life of the plan (and
+    in what to_dict saves).
+
+    Example:
+        plan = ObfuscationPlan.from_rows(sample_rows, header)
+        for row in plan.transform_rows(rows):
+            ...
+
+    Attributes:
+        header: List of column names, or None
+        plans: One ColumnPlan per column
+        variation_percent: Percentage range for numeric randomization
+        rng: Random number source for the numeric noise and for the
+            replacements of values first seen in a batch; a private generator
+            when the plan is seeded, so the host's random state is untouched
+    """
+
+    def __init__(self, plans, header=None, variation_percent=DEFAULT_VARIATION_PERCENT,
+                 seed=None):
+        self.header = header
+        self.plans = plans
+        self.variation_percent = variation_percent
+        self.rng = random.Random(seed) if seed is not None else random
+
+    @classmethod
+    def from_rows(cls, rows, header=None, variation_percent=DEFAULT_VARIATION_PERCENT,
+                  mapping_store=None, seed=None, schema=None, report=None, date_shift=None):
+        """
+        Build a plan by profiling sample rows.
+
+        Args:
+            rows: Iterable of sample rows (lists of cell values); may be
+                empty when a schema covers every column of the header
+            header: Optional list of column names, used as mapping domains
+            variation_percent: Percentage range for numeric randomization
+            mapping_store: Optional MappingStore to reuse and record mappings in
+            seed: Optional random seed for reproducibility; it seeds a
+                private generator, not the global random module
+            schema: Optional schema (see load_schema) naming column treatments
+            report: Optional RunReport to record the columns in
+            date_shift: Optional maximum number of days the dates of each
+                date column are shifted by
+        """
+        rng = random.Random(seed) if seed is not None else random
+        header = header or []
+        treatments = column_treatments(schema, header)
+        profilers = [ColumnProfiler() for _ in header]
+        for row in rows:
+            while len(profilers) < len(row):
+                profilers.append(ColumnProfiler())
+            for i, (profiler, value) in enumerate(zip(profilers, row)):
+                if _needs_profile(treatments.get(i)):
+                    profiler.add(value)
+        plans = _plan_columns(header, profilers, variation_percent, mapping_store,
+                              report if report is not None else NULL_REPORT, treatments,
+                              date_shift, rng)
+        return cls(plans, header or None, variation_percent, seed)
+
+    @classmethod
+    def from_csv(cls, input_file, sample_rows=None, variation_percent=DEFAULT_VARIATION_PERCENT,
+                 mapping_store=None, seed=None, schema=None, date_shift=None):
+        """
+        Build a plan from the header and the first sample_rows rows of a CSV
+        file (all rows if sample_rows is None).
+        """
+        with open_text(input_file) as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = reader if sample_rows is None else itertools.islice(reader, sample_rows)
+            return cls.from_rows(rows, header, variation_percent, mapping_store, seed, schema,
+                                 date_shift=date_shift)
+
+    def output_header(self):
+        """Return the header of the obfuscated rows, without the dropped columns."""
+        return output_header(self.header or [], self.plans)
+
+    def to_dict(self):
+        """Return a JSON-serializable description of this plan."""
+        return {
+            'header': self.header,
+            'variation_percent': self.variation_percent,
+            'columns': [plan.to_dict() for plan in self.plans],
+        }
+
+    @classmethod
+    def from_dict(cls, data, mapping_store=None, seed=None):
+        """
+        Rebuild a plan from the output of to_dict.
+
+        Args:
+            data: Dict produced by to_dict
+            mapping_store: The MappingStore of plans that were built with one
+            seed: Optional random seed for the numeric noise
+        """
+        plans = [ColumnPlan.from_dict(column, mapping_store) for column in data['columns']]
+        return cls(plans, data.get('header'),
+                   data.get('variation_percent', DEFAULT_VARIATION_PERCENT), seed)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path, mapping_store=None, seed=None):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f), mapping_store, seed)
+
+    def transform_batch(self, rows, report=None):
+        """
+        Obfuscate a batch of rows.
+
+        Args:
+            rows: List of rows (lists of cell values)
+            report: Optional RunReport to time the stages in
+
+        Returns:
+            The obfuscated rows, as tuples
+        """
+        extend_plans(self.plans, rows, self.variation_percent, self.rng)
+        return transform_chunk(self.plans, rows, self.rng, report)
+
+    def transform_rows(self, rows, batch_size=DEFAULT_CHUNK_SIZE):
+        """
+        Obfuscate an iterable of rows lazily, batch_size rows at a time.
+
+        Yields:
+            The obfuscated rows, as tuples
+        """
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                return
+            yield from self.transform_batch(batch)
+
+def obfuscate_csv_stream(input_file, output_file, seed=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                         sample_size=0, confidence=0.999,
+                         variation_percent=DEFAULT_VARIATION_PERCENT, mapping_store=None,
+                         report=None, pipeline=False, queue_size=DEFAULT_QUEUE_SIZE,
+                         schema=None, date_shift=None):
+    """
+    Obfuscate a CSV file in bounded memory using two streaming passes.
+
+    The first pass profiles every column and builds its plan; the second
+    rewrites the rows chunk by chunk straight to the output file. Peak memory
+    depends on the number of distinct text values, not on the row count.
+
+    With pipeline, reading and parsing run in a reader thread and
+    serializing and writing in a writer thread, connected to the obfuscation
+    by queues of at most queue_size chunks. Decompression, compression and
+    disk I/O then overlap with the obfuscation; the output is the same.
+
+    Args:
+        input_file: Path to the input CSV file
+        output_file: Path to the output CSV file
+        seed: Optional random seed for reproducibility
+        chunk_size: Number of rows held in memory at a time
+        sample_size: Reservoir size per column for early type decisions
+        confidence: Confidence level required for a sample-based decision
+        variation_percent: Percentage range for numeric randomization
+        mapping_store: Optional path of a MappingStore shared across runs
+        report: Optional RunReport to record timings and column details in
+        pipeline: Overlap reading, obfuscating and writing in three threads
+        queue_size: Chunks buffered between the threads in pipelined mode
+        schema: Optional schema (see load_schema) naming column treatments
+        date_shift: Optional maximum number of days the dates of each date
+            column are shifted by (one random offset per column)
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    report = report if report is not None else RunReport()
+    report.start('pipeline' if pipeline else 'stream', input_file, output_file)
+    store = open_mapping_store(mapping_store)
+    try:
+        _check_rereadable_input(input_file, 'streaming')
+        report.bytes_in = os.path.getsize(input_file)
+
+        # Pass 1: profile the columns and build the plans
+        header, plans = build_column_plans(input_file, chunk_size, sample_size, confidence,
+                                           variation_percent, store, report, pipeline,
+                                           queue_size, schema, date_shift)
+
+        # Pass 2: rewrite the rows chunk by chunk
+        with open_text(input_file) as fin, open_text(output_file, 'w') as fout:
+            reader = csv.reader(fin)
+            next(reader)
+            writer = csv.writer(fout)
+            writer.writerow(output_header(header, plans))
+            chunks = _timed(iter_chunks(reader, chunk_size), report, 'parse')
+            write = partial(_write_rows, writer, report)
+            if pipeline:
+                with closing(_iter_in_thread(chunks, queue_size)) as chunks, \
+                        _ThreadedWriter(write, queue_size) as output:
+                    for chunk in chunks:
+                        report.rows += len(chunk)
+                        output.put(transform_chunk(plans, chunk, random, report))
+            else:
+                for chunk in chunks:
+                    report.rows += len(chunk)
+                    write(transform_chunk(plans, chunk, random, report))
+
+        _print_status(f"CSV obfuscation complete. Output saved to {output_file}", output_file)
+        return True
+    except Exception as e:
+        report.record_error(e)
+        _print_status(f"Error obfuscating CSV: {e}", output_file)
+        return False
+    finally:
+        report.finish()
+        if store is not None:
+            store.close()
+
+def _write_rows(writer, report, rows):
+    with report.stage('write'):
+        writer.writerows(rows)
+
+def derive_rng(seed, index):
+    """
+    Return an independent random generator for one chunk of the input.
+
+    With a seed, the stream depends only on (seed, index), so a chunk gets the
+    same random numbers whichever worker processes it. Without a seed the
+    generator is seeded from system entropy.
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random(f'{seed}:{index}')
+
+def _count_quotes(buf, start, end):
+    """Count the double quote bytes in buf[start:end]."""
+    count = 0
+    pos = buf.find(b'"', start, end)
+    while pos != -1:
+        count += 1
+        pos = buf.find(b'"', pos + 1, end)
+    return count
+
+def _next_row_end(buf, pos, quoted=False):
+    """
+    Return the offset just past the first row terminator at or after pos.
+
+    Newlines inside quoted fields are skipped by tracking the parity of the
+    quote characters seen so far (an escaped "" leaves the parity unchanged).
+    Returns len(buf) if no further row terminator exists.
+    """
+    while True:
+        newline = buf.find(b'\n', pos)
+        if newline == -1:
+            return len(buf)
+        quoted ^= bool(_count_quotes(buf, pos, newline) & 1)
+        pos = newline + 1
+        if not quoted:
+            return pos
+
+def find_row_boundaries(buf, start, chunk_bytes=DEFAULT_CHUNK_BYTES, end=None):
+    """
+    Split buf[start:] into byte ranges of roughly chunk_bytes that end on rows.
+
+    Quoted fields containing newlines are never split. The boundaries depend
+    only on the data and chunk_bytes.
+
+    Args:
+        buf: A bytes-like object (typically an mmap) holding the CSV file
+        start: Offset of the first data row
+        chunk_bytes: Target size of each range
+        end: Offset where the data stops (default: the end of buf)
+
+    Returns:
+        A list of (start, end) offsets covering buf[start:end]
+    """
+    size = len(buf) if end is None else end
+    ranges = []
+    pos = start
+    while pos < size:
+        target = pos + chunk_bytes
+        if target >= size:
+            ranges.append((pos, size))
+            break
+        # pos is always a row start, so the quote state at target follows
+        # from the quotes in between
+        quoted = bool(_count_quotes(buf, pos, target) & 1)
+        row_end = min(_next_row_end(buf, target, quoted), size)
+        ranges.append((pos, row_end))
+        pos = row_end
+    return ranges
+
+def _complete_rows_end(buf, start):
+    """
+    Return the offset just past the last complete row at or after start.
+
+    A trailing row without its terminator (e.g. one still being appended)
+    is left out. start must be the beginning of a row.
+    """
+    end = buf.rfind(b'\n', start)
+    while end != -1:
+        if not _count_quotes(buf, start, end) & 1:
+            return end + 1
+        end = buf.rfind(b'\n', start, end)
+    return start
+
+def _merge_profiles(chunk_profiles):
+    """Merge per-chunk lists of ColumnProfilers, given in input order."""
+    profilers = []
+    for chunk_profilers in chunk_profiles:
+        for i, profiler in enumerate(chunk_profilers):
+            if i < len(profilers):
+                profilers[i].merge(profiler)
+            else:
+                profilers.append(profiler)
+    return profilers
+
+def _read_byte_range(input_file, start, end):
+    """Decode the rows stored in input_file[start:end]."""
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+
+def _profile_byte_range(task):
+    """Worker: profile the rows of one byte range, except the columns in skip."""
+    input_file, start, end, skip = task
+    profilers = []
+    active = []
+    for row in _read_byte_range(input_file, start, end):
+        while len(profilers) < len(row):
+            profiler = ColumnProfiler()
+            if len(profilers) not in skip:
+                active.append((len(profilers), profiler))
+            profilers.append(profiler)
+        width = len(row)
+        for index, profiler in active:
+            if index < width:
+                profiler.add(row[index])
+    return profilers
+
+def _unprofiled_columns(treatments):
+    return frozenset(i for i, treatment in treatments.items() if not _needs_profile(treatment))
+
+# Column plans shared by the transform workers, set by _init_transform_worker
+_worker_plans = None
+
+def _init_transform_worker(plans):
+    global _worker_plans
+    _worker_plans = plans
+
+def _transform_byte_range(task):
+    """
+    Worker: obfuscate the rows of one byte range.
+
+    Returns:
+        A (csv_text, row_count) tuple
+    """
+    input_file, start, end, seed, index = task
+    plans = _worker_plans
+    rng = derive_rng(seed, index)
+    out = io.StringIO()
+    rows = list(_read_byte_range(input_file, start, end))
+    csv.writer(out).writerows(transform_chunk(plans, rows, rng))
+    return out.getvalue(), len(rows)
+
+def _ordered_map(executor, func, tasks, window):
+    """Like executor.map, but with at most window tasks in flight."""
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(func, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def obfuscate_csv_parallel(input_file, output_file, seed=None, workers=2,
+                           chunk_bytes=DEFAULT_CHUNK_BYTES,
+                           variation_percent=DEFAULT_VARIATION_PERCENT, mapping_store=None,
+                           report=None, schema=None, date_shift=None):
+    """
+    Obfuscate a CSV file using a pool of worker processes.
+
+    The input is memory-mapped and split into byte ranges at row boundaries.
+    The ranges are profiled in parallel and the merged profiles give one
+    shared column plan; the ranges are then obfuscated in parallel and
+    written back in input order. Each range draws its numeric noise from
+    derive_rng(seed, index), so with a seed the output is byte-identical
+    for any number of workers (for a given chunk_bytes).
+
+    Args:
+        input_file: Path to the input CSV file
+        output_file: Path to the output CSV file
+        seed: Optional random seed for reproducibility
+        workers: Number of worker processes
+        chunk_bytes: Target size of each byte range
+        variation_percent: Percentage range for numeric randomization
+        mapping_store: Optional path of a MappingStore shared across runs
+        report: Optional RunReport to record timings and column details in;
+            stage CPU times cover this process only, not the workers
+        schema: Optional schema (see load_schema) naming column treatments
+        date_shift: Optional maximum number of days the dates of each date
+            column are shifted by (one random offset per column)
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    report = report if report is not None else RunReport()
+    report.start('parallel', input_file, output_file)
+    store = open_mapping_store(mapping_store)
+    try:
+        _check_seekable_input(input_file, 'parallel')
+        if os.path.getsize(input_file) == 0:
+            # An empty file cannot be mapped, and has no rows to split
+            _write_empty_output(output_file)
+            _print_status(f"CSV obfuscation complete. Output saved to {output_file}",
+                          output_file)
+            return True
+        with report.stage('split'), open(input_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            report.bytes_in = len(buf)
+            header_end = _next_row_end(buf, 0)
+            header = next(csv.reader(io.StringIO(buf[:header_end].decode('utf-8'), newline='')))
+            ranges = find_row_boundaries(buf, header_end, chunk_bytes)
+
+        # Pass 1: profile the ranges and merge them into one plan per column
+        treatments = column_treatments(schema, header)
+        skip = _unprofiled_columns(treatments)
+        profile_tasks = [(input_file, start, end, skip) for start, end in ranges]
+        with report.stage('profile'):
+            if workers > 1:
+                with ProcessPoolExecutor(workers) as executor:
+                    chunk_profiles = list(executor.map(_profile_byte_range, profile_tasks))
+            else:
+                chunk_profiles = [_profile_byte_range(task) for task in profile_tasks]
+            profilers = _merge_profiles(chunk_profiles)
+        plans = _plan_columns(header, profilers, variation_percent, store, report, treatments,
+                              date_shift)
+
+        # Pass 2: obfuscate the ranges and write them in input order
+        transform_tasks = [(input_file, start, end, seed, index)
+                           for index, (start, end) in enumerate(ranges)]
+        with open_text(output_file, 'w') as fout:
+            csv.writer(fout).writerow(output_header(header, plans))
+            if workers > 1:
+                with ProcessPoolExecutor(workers, initializer=_init_transform_worker,
+                                         initargs=(plans,)) as executor:
+                    results = _ordered_map(executor, _transform_byte_range,
+                                           transform_tasks, workers * 2)
+                    _write_results(fout, results, report)
+            else:
+                _init_transform_worker(plans)
+                results = (_transform_byte_range(task) for task in transform_tasks)
+                _write_results(fout, results, report)
+
+        _print_status(f"CSV obfuscation complete. Output saved to {output_file}", output_file)
+        return True
+    except Exception as e:
+        report.record_error(e)
+        _print_status(f"Error obfuscating CSV: {e}", output_file)
+        return False
+    finally:
+        report.finish()
+        if store is not None:
+            store.close()
+
+def _write_results(fout, results, report):
+    """Write the (csv_text, row_count) results of _transform_byte_range in order."""
+    while True:
+        # Time spent waiting for the next range, in the workers or in process
+        with report.stage('transform'):
+            result = next(results, None)
+        if result is None:
+            return
+        text, row_count = result
+        report.rows += row_count
+        with report.stage('write'):
+            fout.write(text)
+
+def _load_state(state_file):
+    """Load an incremental-mode checkpoint written by _save_state."""
+    with open(state_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _save_state(state_file, state):
+    """Write an incremental-mode checkpoint atomically."""
+    tmp_file = state_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_file, state_file)
+
+def _truncate_output(output_file, size, state_file):
+    """Cut the output back to its size at the last checkpoint, if it grew since."""
+    if size is None:
+        return
+    current = os.path.getsize(output_file)
+    if current < size:
+        raise ValueError(f"{output_file} is shorter than at the last run; "
+                         f"remove {state_file} to start over")
+    if current > size:
+        with open(output_file, 'r+b') as f:
+            f.truncate(size)
+
+def obfuscate_csv_incremental(input_file, output_file, seed=None,
+                              variation_percent=DEFAULT_VARIATION_PERCENT,
+                              mapping_store=None, chunk_bytes=DEFAULT_CHUNK_BYTES, report=None,
+                              schema=None, date_shift=None):
+    """
+    Obfuscate only the rows appended to a CSV file since the previous run.
+
+    A checkpoint is kept next to the output (output_file + STATE_SUFFIX)
+    holding the header, the column plans, the random generator state, the
+    byte offset of the last processed row and the size of the output. Each
+    run resumes from that offset, obfuscates the new complete rows with the
+    saved plans (new text values get new replacements, old ones keep theirs)
+    and appends them to the output, so the work depends on the size of the
+    appended data only. Rows appended by a run that stopped before saving
+    its checkpoint are truncated away first, so they are not written twice.
+    Without a checkpoint (or without the output) the whole file is processed.
+
+    Args:
+        input_file: Path to the input CSV file, which may only be appended to
+        output_file: Path to the output CSV file
+        seed: Optional random seed, used when there is no checkpoint yet
+        variation_percent: Percentage range for numeric randomization
+        mapping_store: Optional path of a MappingStore shared across runs
+        chunk_bytes: Bytes of input processed at a time
+        report: Optional RunReport to record timings and column details in
+        schema: Optional schema (see load_schema) naming column treatments;
+            like the column types, it is fixed by the first run
+        date_shift: Optional maximum number of days the dates of each date
+            column are shifted by; the offsets are drawn by the first run
+    """
+    state_file = output_file + STATE_SUFFIX
+    report = report if report is not None else RunReport()
+    report.start('incremental', input_file, output_file)
+    store = open_mapping_store(mapping_store)
+    try:
+        _check_seekable_input(input_file, 'incremental')
+        state = None
+        if os.path.exists(state_file) and os.path.exists(output_file):
+            state = _load_state(state_file)
+        if os.path.getsize(input_file) == 0:
+            if state is not None:
+                raise ValueError(f"{input_file} is shorter than at the last run; "
+                                 f"remove {state_file} to start over")
+            # Nothing to checkpoint yet: the next run starts from scratch
+            _write_empty_output(output_file)
+            _print_status(f"CSV obfuscation complete. Output saved to {output_file}",
+                          output_file)
+            return True
+
+        with report.stage('split'), open(input_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            header_end = _next_row_end(buf, 0)
+            header = next(csv.reader(io.StringIO(buf[:header_end].decode('utf-8'), newline='')))
+            if state is not None:
+                if state['header'] != header:
+                    raise ValueError(f"header of {input_file} changed since the last run; "
+                                     f"remove {state_file} to start over")
+                start = state['offset']
+                if start > len(buf):
+                    raise ValueError(f"{input_file} is shorter than at the last run; "
+                                     f"remove {state_file} to start over")
+            else:
+                start = header_end
+            end = _complete_rows_end(buf, start)
+            ranges = find_row_boundaries(buf, start, chunk_bytes, end)
+            report.bytes_in = end - start
+
+        if state is not None:
+            _truncate_output(output_file, state.get('output_size'), state_file)
+            with report.stage('plan'):
+                plans = [ColumnPlan.from_dict(data, store) for data in state['plans']]
+            for i, plan in enumerate(plans):
+                report.add_column(column_domain(header, i), plan)
+            version, internal, gauss_next = state['random_state']
+            random.setstate((version, tuple(internal), gauss_next))
+        else:
+            if seed is not None:
+                random.seed(seed)
+            treatments = column_treatments(schema, header)
+            skip = _unprofiled_columns(treatments)
+            with report.stage('profile'):
+                profilers = _merge_profiles(
+                    _profile_byte_range((input_file, range_start, range_end, skip))
+                    for range_start, range_end in ranges)
+            plans = _plan_columns(header, profilers, variation_percent, store, report,
+                                  treatments, date_shift)
+
+        with open_text(output_file, 'a' if state is not None else 'w') as fout:
+            writer = csv.writer(fout)
+            if state is None:
+                writer.writerow(output_header(header, plans))
+            for range_start, range_end in ranges:
+                with report.stage('parse'):
+                    rows = list(_read_byte_range(input_file, range_start, range_end))
+                report.rows += len(rows)
+                with report.stage('extend'):
+                    extend_plans(plans, rows, variation_percent)
+                rows = transform_chunk(plans, rows, random, report)
+                with report.stage('write'):
+                    writer.writerows(rows)
+
+        _save_state(state_file, {
+            'header': header,
+            'offset': end,
+            'output_size': os.path.getsize(output_file),
+            'plans': [plan.to_dict() for plan in plans],
+            'random_state': random.getstate(),
+        })
+
+        _print_status(f"CSV obfuscation complete. Output saved to {output_file}", output_file)
+        return True
+    except Exception as e:
+        report.record_error(e)
+        _print_status(f"Error obfuscating CSV: {e}", output_file)
+        return False
+    finally:
+        report.finish()
+        if store is not None:
+            store.close()
+
+def parse_domain(spec):
+    """
+    Parse a column-name domain given as DOMAIN=PATTERN[,PATTERN...].
+
+    Patterns are shell-style wildcards matched against column names,
+    ignoring case.
+
+    Returns:
+        A (domain, patterns) tuple
+    """
+    domain, sep, patterns = spec.partition('=')
+    patterns = [pattern.strip() for pattern in patterns.split(',') if pattern.strip()]
+    if not sep or not domain or not patterns:
+        raise ValueError(f"domain '{spec}' is not of the form DOMAIN=PATTERN[,PATTERN...]")
+    return domain, patterns
+
+def column_domains(header, width, domains=None):
+    """
+    Mapping domain of each column of a file in a batch.
+
+    Args:
+        header: The header row
+        width: Number of columns, which may exceed the header
+        domains: Optional {domain: [column name patterns]}; the first
+            matching domain wins, and other columns are their own domain
+            (see column_domain)
+    """
+    result = []
+    for i in range(width):
+        name = header[i].lower() if i < len(header) else ''
+        for domain, patterns in (domains or {}).items():
+            if name and any(fnmatch.fnmatchcase(name, pattern.lower()) for pattern in patterns):
+                result.append(domain)
+                break
+        else:
+            result.append(column_domain(header, i))
+    return result
+
+def find_batch_files(input_spec, output_dir):
+    """
+    List the files of a batch with their output paths.
+
+    Args:
+        input_spec: A directory, searched recursively for files ending in
+            BATCH_SUFFIXES, or a glob pattern ('**' matches subdirectories)
+        output_dir: Directory the outputs are written to, keeping the paths
+            of the inputs relative to the input directory (or to the common
+            directory of the matched files); files already in it are skipped
+
+    Returns:
+        A list of (input_file, output_file) tuples, sorted by input path
+    """
+    if os.path.isdir(input_spec):
+        base = input_spec
+        files = [os.path.join(root, name)
+                 for root, _, names in os.walk(input_spec) for name in names
+                 if name.lower().endswith(BATCH_SUFFIXES)]
+    else:
+        files = [path for path in glob.glob(input_spec, recursive=True) if os.path.isfile(path)]
+        base = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files]) \
+            if files else ''
+    output_root = os.path.abspath(output_dir) + os.sep
+    files = sorted(path for path in files if not os.path.abspath(path).startswith(output_root))
+    return [(path, os.path.join(output_dir, os.path.relpath(os.path.abspath(path),
+                                                            os.path.abspath(base))))
+            for path in files]
+
+def _profile_batch_file(task):
+    """Worker: profile one file of a batch; returns (header, profilers)."""
+    input_file, schema = task
+    with open_text(input_file) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        profilers = profile_chunks(iter_chunks(reader, DEFAULT_CHUNK_SIZE),
+                                   column_treatments(schema, header))
+    while len(profilers) < len(header):
+        profilers.append(ColumnProfiler())
+    return header, profilers
+
+def _obfuscate_batch_file(task):
+    """
+    Worker: obfuscate one file of a batch with the shared domain plans.
+
+    Returns:
+        A (row_count, bytes_out, seconds) tuple
+    """
+    input_file, output_file, domains, chunk_size, seed, index = task
+    start = time.perf_counter()
+    plans = [_worker_plans[domain] for domain in domains]
+    rng = derive_rng(seed, index)
+    rows = 0
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    with open_text(input_file) as fin, open_text(output_file, 'w') as fout:
+        reader = csv.reader(fin)
+        header = next(reader, None)
+        writer = csv.writer(fout)
+        if header is not None:
+            writer.writerow(output_header(header, plans))
+        for chunk in iter_chunks(reader, chunk_size):
+            rows += len(chunk)
+            writer.writerows(transform_chunk(plans, chunk, rng))
+    return rows, os.path.getsize(output_file), time.perf_counter() - start
+
+@contextmanager
+def _batch_pool(workers, plans=None):
+    """
+    Process pool of a batch pass, or None to run the tasks in this process.
+
+    With plans, each worker starts with them as its _worker_plans.
+    """
+    if plans is not None and workers <= 1:
+        _init_transform_worker(plans)
+    if workers <= 1:
+        yield None
+        return
+    initargs = {} if plans is None else {'initializer': _init_transform_worker,
+                                         'initargs': (plans,)}
+    with ProcessPoolExecutor(workers, **initargs) as executor:
+        yield executor
+
+def _map_largest_first(executor, func, tasks, sizes):
+    """
+    Run func over tasks, submitting the largest first.
+
+    Yields (task index, result or exception) as the tasks complete; without
+    an executor the tasks run in this process.
+    """
+    order = sorted(range(len(tasks)), key=lambda i: -sizes[i])
+    if executor is None:
+        for i in order:
+            try:
+                yield i, func(tasks[i])
+            except Exception as e:
+                yield i, e
+        return
+    futures = {executor.submit(func, tasks[i]): i for i in order}
+    for future in as_completed(futures):
+        error = future.exception()
+        yield futures[future], error if error is not None else future.result()
+
+def obfuscate_csv_batch(input_spec, output_dir, seed=None, workers=None,
+                        variation_percent=DEFAULT_VARIATION_PERCENT, mapping_store=None,
+                        report=None, schema=None, domains=None,
+                        chunk_size=DEFAULT_CHUNK_SIZE, date_shift=None):
+    """
+    Obfuscate a set of related CSV files with one process pool and shared mappings.
+
+    Columns are grouped into mapping domains across files: by default a
+    column name is its own domain, so e.g. customer_name maps to the same
+    replacements in every file, and domains can group differently named
+    columns. In a first pass the files are profiled in the pool, and the
+    profiles of each domain are merged into one plan. In a second pass the
+    files are obfuscated in the pool with those plans, each worker writing
+    its own output file. Files are submitted largest first, so that one big
+    file started last does not hold up the whole run, and progress is
+    printed as files complete. Each file draws its numeric noise from
+    derive_rng(seed, index) (index in input path order), so with a seed
+    the outputs do not depend on the number of workers.
+
+    Args:
+        input_spec: Input directory or glob pattern (see find_batch_files)
+        output_dir: Directory of the output files
+        seed: Optional random seed for reproducibility
+        workers: Number of worker processes (default: the number of CPUs)
+        variation_percent: Percentage range for numeric randomization
+        mapping_store: Optional path of a MappingStore shared across runs
+        report: Optional RunReport to record timings and domain details in;
+            stage CPU times cover this process only, not the workers
+        schema: Optional schema (see load_schema) naming column treatments;
+            a domain takes the treatment of its first named column
+        domains: Optional {domain: [column name patterns]} (see column_domains)
+        chunk_size: Number of rows a worker holds in memory at a time
+        date_shift: Optional maximum number of days the dates of each date
+            column are shifted by (one random offset per column)
+    """
+    if seed is not None:
+        random.seed(seed)
+    workers = workers or os.cpu_count() or 1
+
+    report = report if report is not None else RunReport()
+    report.start('batch', input_spec, output_dir)
+    store = open_mapping_store(mapping_store)
+    start = time.perf_counter()
+    try:
+        schema = load_schema(schema)
+        with report.stage('scan'):
+            files = find_batch_files(input_spec, output_dir)
+            if not files:
+                raise ValueError(f"no CSV files found in '{input_spec}'")
+            sizes = [os.path.getsize(input_file) for input_file, _ in files]
+            report.bytes_in = sum(sizes)
+        workers = min(workers, len(files))
+
+        # Pass 1: profile every file and merge the profiles by domain
+        profiles = [None] * len(files)
+        tasks = [(input_file, schema) for input_file, _ in files]
+        with report.stage('profile'):
+            with _batch_pool(workers) as executor:
+                for i, result in _map_largest_first(executor, _profile_batch_file, tasks,
+                                                    sizes):
+                    if isinstance(result, Exception):
+                        raise ValueError(f"{files[i][0]}: {result}") from result
+                    profiles[i] = result
+        domain_names = []
+        domain_profilers = {}
+        domain_treatments = {}
+        file_domains = []
+        for header, profilers in profiles:
+            names = column_domains(header, len(profilers), domains)
+            treatments = column_treatments(schema, header)
+            for i, (domain, profiler) in enumerate(zip(names, profilers)):
+                if domain not in domain_profilers:
+                    domain_names.append(domain)
+                    domain_profilers[domain] = ColumnProfiler()
+                domain_profilers[domain].merge(profiler)
+                if i in treatments:
+                    domain_treatments.setdefault(domain, treatments[i])
+            file_domains.append(names)
+        treatments = {i: domain_treatments[domain] for i, domain in enumerate(domain_names)
+                      if domain in domain_treatments}
+        plans = _plan_columns(domain_names, [domain_profilers[d] for d in domain_names],
+                              variation_percent, store, report, treatments, date_shift)
+        domain_plans = dict(zip(domain_names, plans))
+        del profiles, domain_profilers
+
+        # Pass 2: obfuscate the files, each worker writing its own output
+        tasks = [(input_file, output_file, names, chunk_size, seed, index)
+                 for index, ((input_file, output_file), names)
+                 in enumerate(zip(files, file_domains))]
+        failed = []
+        with report.stage('transform'):
+            with _batch_pool(workers, domain_plans) as executor:
+                results = _map_largest_first(executor, _obfuscate_batch_file, tasks, sizes)
+                for done, (i, result) in enumerate(results, 1):
+                    if isinstance(result, Exception):
+                        failed.append(files[i][0])
+                        print(f"[{done}/{len(files)}] Error obfuscating {files[i][0]}: {result}")
+                        continue
+                    rows, bytes_out, seconds = result
+                    report.rows += rows
+                    report.bytes_out += bytes_out
+                    print(f"[{done}/{len(files)}] {files[i][0]}: {rows} rows, "
+                          f"{sizes[i] / 1e6:.1f} MB in {seconds:.2f}s")
+
+        elapsed = time.perf_counter() - start
+        print(f"Processed {len(files) - len(failed)} of {len(files)} files: {report.rows} rows, "
+              f"{report.bytes_in / 1e6:.1f} MB in {elapsed:.1f}s "
+              f"({report.rows / elapsed:,.0f} rows/s, {report.bytes_in / 1e6 / elapsed:.1f} MB/s)")
+        if failed:
+            raise ValueError(f"{len(failed)} file(s) failed: {', '.join(failed)}")
+        print(f"CSV obfuscation complete. Output saved to {output_dir}")
+        return True
+    except Exception as e:
+        report.record_error(e)
+        print(f"Error obfuscating CSV: {e}")
+        return False
+    finally:
+        report.finish()
+        if store is not None:
+            store.close()
+
+def obfuscate_csv_filter(input_file='-', output_file='-', seed=None,
+                         warmup_rows=DEFAULT_WARMUP_ROWS, chunk_size=DEFAULT_CHUNK_SIZE,
+                         variation_percent=DEFAULT_VARIATION_PERCENT, mapping_store=None,
+                         report=None, schema=None, date_shift=None):
+    """
+    Obfuscate a CSV stream in a single pass, e.g. from stdin to stdout ('-').
+
+    The column plans are built from the header and the first warmup_rows
+    rows; from then on rows are written as soon as each chunk has been
+    read, so the tool can sit in the middle of a shell pipeline. Text
+    values first seen after the warm-up get new replacements as they
+    appear, but the column types are those of the warm-up rows.
+
+    Args:
+        input_file: Path to the input CSV file, or '-' for stdin
+        output_file: Path to the output CSV file, or '-' for stdout
+        seed: Optional random seed for reproducibility
+        warmup_rows: Number of rows profiled before any output
+        chunk_size: Number of rows read, obfuscated and written at a time
+        variation_percent: Percentage range for numeric randomization
+        mapping_store: Optional path of a MappingStore shared across runs
+        report: Optional RunReport to record timings and column details in
+        schema: Optional schema (see load_schema) naming column treatments
+        date_shift: Optional maximum number of days the dates of each date
+            column are shifted by (one random offset per column)
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    report = report if report is not None else RunReport()
+    report.start('filter', input_file, output_file)
+    store = open_mapping_store(mapping_store)
+    try:
+        report.bytes_in = _file_size(input_file)
+        with open_text(input_file) as fin, open_text(output_file, 'w') as fout:
+            reader = csv.reader(fin)
+            header = next(reader)
+            with report.stage('parse'):
+                sample = list(itertools.islice(reader, warmup_rows))
+            plan = ObfuscationPlan.from_rows(sample, header, variation_percent, store,
+                                             schema=schema, report=report,
+                                             date_shift=date_shift)
+            writer = csv.writer(fout)
+            writer.writerow(plan.output_header())
+            chunks = itertools.chain([sample], _timed(iter_chunks(reader, chunk_size),
+                                                      report, 'parse'))
+            for chunk in chunks:
+                report.rows += len(chunk)
+                rows = plan.transform_batch(chunk, report)
+                with report.stage('write'):
+                    writer.writerows(rows)
+                    fout.flush()
+
+        _print_status(f"CSV obfuscation complete. Output saved to {output_file}", output_file)
+        return True
+    except Exception as e:
+        report.record_error(e)
+        _print_status(f"Error obfuscating CSV: {e}", output_file)
+        return False
+    finally:
+        report.finish()
+        if store is not None:
+            store.close()
+
+async def _read_csv_rows(reader, block_size=65536):
+    """Yield lists of rows parsed from an asyncio StreamReader as complete rows arrive."""
+    buf = bytearray()
+    while True:
+        data = await reader.read(block_size)
+        if data:
+            buf += data
+            end = _complete_rows_end(buf, 0)
+        else:
+            end = len(buf)
+        if end:
+            text = bytes(buf[:end]).decode('utf-8')
+            del buf[:end]
+            yield list(csv.reader(io.StringIO(text, newline='')))
+        if not data:
+            return
+
+class ObfuscationServer(object):
+    """
+    Asyncio server obfuscating CSV streamed through TCP or Unix socket connections.
+
+    A client sends a CSV file, header first, and shuts down its writing
+    side; the obfuscated CSV is streamed back as rows arrive. The plan for
+    a header is built from the first warmup_rows rows of the first
+    connection that sends it, then kept in memory: later connections with
+    the same header skip type inference, and their values get the same
+    replacements. Connections are served concurrently.
+
+    Args:
+        variation_percent: Percentage range for numeric randomization
+        mapping_store: Optional path of a MappingStore shared across runs
+        schema: Optional schema (see load_schema) naming column treatments
+        warmup_rows: Number of rows profiled for a new header
+        chunk_size: Maximum number of rows obfuscated between two writes
+        seed: Optional random seed for reproducibility
+        date_shift: Optional maximum number of days the dates of each date
+            column are shifted by (one random offset per header and column)
+    """
+
+    def __init__(self, variation_percent=DEFAULT_VARIATION_PERCENT, mapping_store=None,
+                 schema=None, warmup_rows=DEFAULT_WARMUP_ROWS, chunk_size=DEFAULT_CHUNK_SIZE,
+                 seed=None, date_shift=None):
+        if seed is not None:
+            random.seed(seed)
+        self.date_shift = date_shift
+        self.variation_percent = variation_percent
+        self.store = open_mapping_store(mapping_store)
+        self.schema = load_schema(schema)
+        self.warmup_rows = warmup_rows
+        self.chunk_size = chunk_size
+        self.plans = {}
+
+    async def handle(self, reader, writer):
+        """Obfuscate the CSV stream of one connection."""
+        try:
+            await self._obfuscate_stream(reader, writer)
+        except Exception as e:
+            print(f"Error obfuscating CSV stream: {e}", file=sys.stderr)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _obfuscate_stream(self, reader, writer):
+        blocks = _read_csv_rows(reader)
+        pending = []
+        async for rows in blocks:
+            pending.extend(rows)
+            if len(pending) > self.warmup_rows:
+                break
+        if not pending:
+            return
+        header, rows = pending[0], pending[1:]
+
+        plan = self.plans.get(tuple(header))
+        if plan is None:
+            sample = rows[:self.warmup_rows]
+            # Built without awaiting, so no other connection can race for the header
+            plan = ObfuscationPlan.from_rows(sample, header, self.variation_percent,
+                                             self.store, schema=self.schema,
+                                             date_shift=self.date_shift)
+            self.plans[tuple(header)] = plan
+
+        await self._write_rows(writer, [plan.output_header()])
+        await self._write_rows(writer, rows, plan)
+        async for rows in blocks:
+            await self._write_rows(writer, rows, plan)
+
+    async def _write_rows(self, writer, rows, plan=None):
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows[start:start + self.chunk_size]
+            out = io.StringIO()
+            csv.writer(out).writerows(plan.transform_batch(chunk) if plan else chunk)
+            writer.write(out.getvalue().encode('utf-8'))
+            # Also lets other connections run between chunks
+            await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=DEFAULT_SERVE_PORT, unix_path=None):
+        """Accept connections until cancelled."""
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, path=unix_path)
+            address = unix_path
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            address = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Serving CSV obfuscation on {address}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+
+def obfuscate_csv(input_file, output_file, seed=None,
+                  variation_percent=DEFAULT_VARIATION_PERCENT, mapping_store=None,
+                  report=None, schema=None, date_shift=None):
+    """
+    Obfuscate a CSV file by randomizing numeric values and replacing unique values.
+    
+    Args:
+        input_file: Path to the input CSV file
+        output_file: Path to the output CSV file
+        seed: Optional random seed for reproducibility
+        variation_percent: Percentage range for numeric randomization
+        mapping_store: Optional path of a MappingStore shared across runs
+        report: Optional RunReport to record timings and column details in
+        schema: Optional schema (see load_schema) naming column treatments
+        date_shift: Optional maximum number of days the dates of each date
+            column are shifted by (one random offset per column)
+    """
+    if seed is not None:
+        random.seed(seed)
+    
+    report = report if report is not None else RunReport()
+    report.start('memory', input_file, output_file)
+    store = open_mapping_store(mapping_store)
+    try:
+        report.bytes_in = _file_size(input_file)
+
+        # Read the input CSV file
+        with report.stage('parse'), open_text(input_file) as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            data = list(reader)
+            report.rows = len(data)
+            columns = list(zip(*data))
+            del data
+        
+        # Randomize numeric values and replace unique values with
+        # meaningful English words, one column at a time. Each input column
+        # is released once done, so numeric columns only stay in memory as
+        # typed arrays.
+        treatments = column_treatments(schema, header)
+        for i in range(len(columns)):
+            columns[i] = obfuscate_column(columns[i], variation_percent, random, store,
+                                          column_domain(header, i), report, treatments.get(i),
+                                          date_shift)
+        header = [name for i, name in enumerate(header)
+                  if i >= len(columns) or columns[i] is not None]
+        columns = [column for column in columns if column is not None]
+        
+        # Write the obfuscated data to the output file
+        with report.stage('write'), open_text(output_file, 'w') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(zip(*columns))
+            
+        _print_status(f"CSV obfuscation complete. Output saved to {output_file}", output_file)
+        return True
+    except Exception as e:
+        report.record_error(e)
+        _print_status(f"Error obfuscating CSV: {e}", output_file)
+        return False
+    finally:
+        report.finish()
+        if store is not None:
+            store.close()
+
+def _positive_int(text):
+    """argparse type for counts that must be at least 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{text}'")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {value}')
+    return value
+
+def _add_plan_arguments(parser):
+    """Add the options that shape the column plans, shared by all commands."""
+    parser.add_argument('--seed', type=int, help='Random seed for reproducibility')
+    parser.add_argument('--variation', type=float, default=DEFAULT_VARIATION_PERCENT,
+                        help='Percentage range for numeric randomization '
+                             f'(default {DEFAULT_VARIATION_PERCENT})')
+    parser.add_argument('--mapping-store', metavar='PATH',
+                        help='SQLite file of value mappings reused across files and runs')
+    parser.add_argument('--words', metavar='SPEC', action='append', default=[],
+                        help='External word list: CATEGORY=PATH (one word per line) or a '
+                             'directory of CATEGORY.txt files; may be repeated')
+    parser.add_argument('--schema', metavar='FILE',
+                        help='JSON file of per-column treatments (passthrough, numeric, '
+                             'words, surrogate, drop or date) that replace type inference')
+    parser.add_argument('--date-shift', type=_positive_int, metavar='DAYS',
+                        help='Shift the dates of each date column by a random number of '
+                             'days within +/- DAYS (one offset per column) instead of '
+                             'keeping them')
+
+def _add_warmup_argument(parser):
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP_ROWS,
+                        help='Rows of a stdin or socket stream profiled before output starts '
+                             f'(default {DEFAULT_WARMUP_ROWS})')
+
+def _register_words(parser, args):
+    try:
+        for spec in args.words:
+            register_words(spec)
+    except ValueError as e:
+        parser.error(str(e))
+
+def serve_main(argv):
+    """Run the serve subcommand."""
+    parser = argparse.ArgumentParser(prog='csv_obfuscator.py serve',
+                                     description='Serve CSV obfuscation over TCP or a Unix socket.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVE_PORT,
+                        help=f'TCP port to listen on (default {DEFAULT_SERVE_PORT})')
+    parser.add_argument('--unix', metavar='PATH', help='Listen on a Unix socket instead of TCP')
+    parser.add_argument('--chunk-size', type=_positive_int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Rows obfuscated between two writes (default {DEFAULT_CHUNK_SIZE})')
+    _add_plan_arguments(parser)
+    _add_warmup_argument(parser)
+    args = parser.parse_args(argv)
+    _register_words(parser, args)
+
+    server = ObfuscationServer(args.variation, args.mapping_store, args.schema, args.warmup,
+                               args.chunk_size, args.seed, args.date_shift)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return True
+
+def batch_main(argv):
+    """Run the batch subcommand."""
+    parser = argparse.ArgumentParser(prog='csv_obfuscator.py batch',
+                                     description='Obfuscate a directory of related CSV files '
+                                                 'with shared mappings.')
+    parser.add_argument('input', help='Input directory (searched recursively for '
+                                      f"{', '.join(BATCH_SUFFIXES)} files) or glob pattern")
+    parser.add_argument('output_dir', help='Output directory; input paths are kept '
+                                           'relative to it')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Number of worker processes (default: the number of CPUs)')
+    parser.add_argument('--domain', metavar='SPEC', action='append', default=[],
+                        help='Share mappings between the columns matching the patterns: '
+                             'DOMAIN=PATTERN[,PATTERN...] (case-insensitive wildcards); '
+                             'may be repeated')
+    parser.add_argument('--chunk-size', type=_positive_int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Rows a worker holds in memory at a time (default {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--report', metavar='FILE',
+                        help='Write a JSON report of stage timings, throughput and domain '
+                             'decisions to FILE')
+    _add_plan_arguments(parser)
+    args = parser.parse_args(argv)
+    _register_words(parser, args)
+    try:
+        domains = dict(parse_domain(spec) for spec in args.domain)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = RunReport()
+    result = obfuscate_csv_batch(args.input, args.output_dir, args.seed, args.workers,
+                                 args.variation, args.mapping_store, report, args.schema,
+                                 domains, args.chunk_size, args.date_shift)
+    if args.report:
+        report.save(args.report)
+        print(f"Report saved to {args.report}")
+    return result
+
+def main(argv=None):
+    """Main function to handle command line arguments."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'serve':
+        return serve_main(argv[1:])
+    if argv and argv[0] == 'batch':
+        return batch_main(argv[1:])
+
+    parser = argparse.ArgumentParser(description='Obfuscate CSV files.',
+                                     epilog="Run 'csv_obfuscator.py serve --help' or "
+                                            "'csv_obfuscator.py batch --help' for the server "
+                                            'and batch modes.')
+    parser.add_argument('input', help="Input CSV file, or '-' for stdin "
+                                      '(.gz, .bz2 and .xz are decompressed)')
+    parser.add_argument('output', help="Output CSV file, or '-' for stdout "
+                                       '(.gz, .bz2 and .xz are compressed)')
+    _add_plan_arguments(parser)
+    _add_warmup_argument(parser)
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only obfuscate rows appended since the last run and append '
+                             f'them to the output (state kept in OUTPUT{STATE_SUFFIX})')
+    parser.add_argument('--stream', action='store_true',
+                        help='Process the file in chunks with bounded memory')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Stream with separate reader, obfuscation and writer threads')
+    parser.add_argument('--queue-size', type=_positive_int, default=DEFAULT_QUEUE_SIZE,
+                        help='Chunks buffered between the threads in pipelined mode '
+                             f'(default {DEFAULT_QUEUE_SIZE})')
+    parser.add_argument('--chunk-size', type=_positive_int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Rows per chunk in streaming mode (default {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--sample-size', type=int, default=0,
+                        help='Reservoir sample per column used to decide numeric and date '
+                             'columns early in streaming mode (default 0, disabled)')
+    parser.add_argument('--confidence', type=float, default=0.999,
+                        help='Confidence required for a sample-based decision (default 0.999)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Obfuscate in parallel using N worker processes')
+    parser.add_argument('--chunk-bytes', type=int, default=DEFAULT_CHUNK_BYTES,
+                        help='Bytes per task in parallel mode; seeded output is identical '
+                             f'for any worker count with the same value (default {DEFAULT_CHUNK_BYTES})')
+    parser.add_argument('--report', metavar='FILE',
+                        help='Write a JSON report of stage timings, throughput, memory '
+                             'and column decisions to FILE')
+    parser.add_argument('--profile', metavar='PATH', nargs='?', const='',
+                        help='Run under cProfile and save the stats to PATH '
+                             '(default OUTPUT.prof)')
+    
+    args = parser.parse_args(argv)
+    _register_words(parser, args)
+    report = RunReport()
+
+    profiler = None
+    if args.profile is not None:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        result = _run(args, report)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            default_path = 'csv_obfuscator.prof' if args.output == '-' else args.output + '.prof'
+            profile_path = args.profile or default_path
+            profiler.dump_stats(profile_path)
+            _print_status(f"Profile saved to {profile_path}", args.output)
+
+    if args.report:
+        report.save(args.report)
+        _print_status(f"Report saved to {args.report}", args.output)
+    return result
+
+def _run(args, report):
+    """Dispatch the parsed command line arguments to the matching mode."""
+    if args.input == '-' and not args.incremental and not args.workers:
+        return obfuscate_csv_filter(args.input, args.output, args.seed, args.warmup,
+                                    args.chunk_size, args.variation, args.mapping_store,
+                                    report, args.schema, args.date_shift)
+    if args.incremental:
+        return obfuscate_csv_incremental(args.input, args.output, args.seed, args.variation,
+                                         args.mapping_store, args.chunk_bytes, report,
+                                         args.schema, args.date_shift)
+    if args.workers:
+        return obfuscate_csv_parallel(args.input, args.output, args.seed, args.workers,
+                                      args.chunk_bytes, args.variation, args.mapping_store,
+                                      report, args.schema, args.date_shift)
+    if args.stream or args.pipeline:
+        return obfuscate_csv_stream(args.input, args.output, args.seed, args.chunk_size,
+                                    args.sample_size, args.confidence, args.variation,
+                                    args.mapping_store, report, args.pipeline,
+                                    args.queue_size, args.schema, args.date_shift)
+    return obfuscate_csv(args.input, args.output, args.seed, args.variation,
+                         args.mapping_store, report, args.schema, args.date_shift)
 
 if __name__ == '__main__':
     main()
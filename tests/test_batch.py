@@ -0,0 +1,44 @@
+"""Tests for batch obfuscation of related files."""
+
+import csv
+import os
+
+from csv_obfuscator import obfuscate_csv_batch
+
+NAMES = ['Alice Smith', 'Bob Jones', 'Carol White', 'Dan Brown', 'Eve Black', 'Frank Green']
+
+
+def _write_csv(path, header, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _read_column(path, column):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row[column] for row in csv.DictReader(f)]
+
+
+def test_domain_maps_columns_of_different_files_alike(tmp_path):
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    input_dir.mkdir()
+    orders = [NAMES[i % len(NAMES)] for i in range(60)]
+    clients = [NAMES[(i * 5) % len(NAMES)] for i in range(40)]
+    _write_csv(str(input_dir / 'orders.csv'), ['order_id', 'customer_name'],
+               [[i, name] for i, name in enumerate(orders)])
+    _write_csv(str(input_dir / 'invoices.csv'), ['invoice_id', 'client'],
+               [[i, name] for i, name in enumerate(clients)])
+
+    assert obfuscate_csv_batch(str(input_dir), str(output_dir), seed=2, workers=1,
+                               domains={'customer': ['customer_name', 'client']})
+
+    mapping = {}
+    for name, column, originals in (('orders.csv', 'customer_name', orders),
+                                    ('invoices.csv', 'client', clients)):
+        replaced = _read_column(os.path.join(str(output_dir), name), column)
+        assert len(replaced) == len(originals)
+        for original, replacement in zip(originals, replaced):
+            assert replacement != original
+            assert mapping.setdefault(original, replacement) == replacement
+    assert len(set(mapping.values())) == len(NAMES)
@@ -0,0 +1,53 @@
+"""Tests for date detection and shifting."""
+
+import pytest
+
+from csv_obfuscator import _matches_date, detect_date_format, shift_date
+
+
+@pytest.mark.parametrize('value', [
+    '2020-03-15', '2020/03/15', '2023-01-15T10:30:00Z', '2023-01-15 10:30:00+02:00',
+    '15.01.2023', '15/03/20', '03/15/2020', '15 March 2020', '15-Mar-20', 'March 15, 2020',
+    'January 15th 2023',
+])
+def test_dates_are_recognized(value):
+    assert _matches_date(value)
+
+
+@pytest.mark.parametrize('value', [
+    '3.14.15', '1.2.34', '32/01/2020', '2020-13-01', '12345', '1.5', 'Marchy 15, 2020',
+])
+def test_non_dates_are_rejected(value):
+    assert not _matches_date(value)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('January 15th 2023', 'February 4th 2023'),
+    ('15/01/2023', '04/02/2023'),
+    ('2023-01-15', '2023-02-04'),
+    ('2023-01-15T10:30:00Z', '2023-02-04T10:30:00Z'),
+    ('09-JAN-23', '29-JAN-23'),
+    ('jan 15, 2023', 'feb 4, 2023'),
+    ('5.1.2023', '25.1.2023'),
+])
+def test_shift_keeps_the_layout(value, expected):
+    assert shift_date(value, 20) == expected
+
+
+def test_shift_across_year_end_and_backwards():
+    assert shift_date('2023-12-25', 10) == '2024-01-04'
+    assert shift_date('03/01/2024', -2, ('mdy',)) == '02/28/2024'
+    assert shift_date('1700000000', 1, ('epoch',)) == '1700086400'
+
+
+def test_shift_returns_none_for_non_dates():
+    assert shift_date('not a date', 5) is None
+    assert shift_date('31/02/2023', 5) is None
+
+
+def test_detect_date_format():
+    assert detect_date_format(['03/04/2020', '03/15/2020']) == 'mdy'
+    assert detect_date_format(['03/04/2020', '15/03/2020']) == 'dmy'
+    assert detect_date_format(['2020-01-01']) == 'ymd'
+    assert detect_date_format(['15/03/2020', '03/15/2020']) is None
+    assert detect_date_format(['n/a', '']) is None
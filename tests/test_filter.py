@@ -0,0 +1,33 @@
+"""Tests for the single-pass filter mode."""
+
+import csv
+
+from csv_obfuscator import obfuscate_csv_filter
+
+
+def _write_csv(path, header, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_text_after_numeric_warmup_is_replaced(tmp_path):
+    input_file, output_file = str(tmp_path / 'in.csv'), str(tmp_path / 'out.csv')
+    rows = [[str(i), str(1000 + i), '2020-01-%02d' % (i % 28 + 1)] for i in range(150)]
+    rows += [[str(i), f'Customer Name {i}', f'not recorded {i}'] for i in range(50)]
+    _write_csv(input_file, ['id', 'customer', 'joined'], rows)
+
+    assert obfuscate_csv_filter(input_file, output_file, seed=1, warmup_rows=100)
+    output = _read_rows(output_file)
+    assert len(output) == len(rows)
+    for original, obfuscated in zip(rows[150:], output[150:]):
+        assert obfuscated[1] != original[1]
+        assert obfuscated[2] != original[2]
+    # Dates of the date column are still kept
+    assert [row[2] for row in output[:150]] == [row[2] for row in rows[:150]]
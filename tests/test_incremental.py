@@ -0,0 +1,63 @@
+"""Tests for incremental append mode."""
+
+import csv
+
+from csv_obfuscator import STATE_SUFFIX, obfuscate_csv_incremental
+
+
+def _write_csv(path, header, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_text_appended_to_numeric_column_is_replaced(tmp_path):
+    input_file, output_file = str(tmp_path / 'in.csv'), str(tmp_path / 'out.csv')
+    header = ['id', 'customer']
+    rows = [[str(i), str(1000 + i)] for i in range(100)]
+    _write_csv(input_file, header, rows)
+    assert obfuscate_csv_incremental(input_file, output_file, seed=1)
+
+    appended = [[str(i), f'Customer Name {i}'] for i in range(20)]
+    _write_csv(input_file, header, rows + appended)
+    assert obfuscate_csv_incremental(input_file, output_file)
+
+    output = _read_rows(output_file)
+    assert len(output) == len(rows) + len(appended)
+    for original, obfuscated in zip(appended, output[len(rows):]):
+        assert obfuscated[1] != original[1]
+
+
+def test_interrupted_run_is_truncated_and_resumed(tmp_path):
+    input_file, output_file = str(tmp_path / 'in.csv'), str(tmp_path / 'out.csv')
+    state_file = output_file + STATE_SUFFIX
+    header = ['id', 'name', 'amount']
+    rows = [[str(i), f'Name {i % 30}', f'{i * 2.5:.1f}'] for i in range(200)]
+    appended = [[str(i), f'Name {i % 30}', f'{i * 2.5:.1f}'] for i in range(200, 300)]
+    _write_csv(input_file, header, rows)
+    assert obfuscate_csv_incremental(input_file, output_file, seed=3)
+    with open(state_file, encoding='utf-8') as f:
+        checkpoint = f.read()
+
+    _write_csv(input_file, header, rows + appended)
+    assert obfuscate_csv_incremental(input_file, output_file)
+    with open(output_file, 'rb') as f:
+        expected = f.read()
+
+    # A crash after writing output but before saving the checkpoint leaves
+    # the old checkpoint next to a longer, partly written output file
+    with open(state_file, 'w', encoding='utf-8') as f:
+        f.write(checkpoint)
+    with open(output_file, 'ab') as f:
+        f.write(b'999,partial row')
+    assert obfuscate_csv_incremental(input_file, output_file)
+
+    with open(output_file, 'rb') as f:
+        assert f.read() == expected
+    assert len(_read_rows(output_file)) == len(rows) + len(appended)
@@ -0,0 +1,23 @@
+"""Regression tests for MappingStore."""
+
+from csv_obfuscator import MappingStore, ObfuscationPlan
+
+
+def test_assign_replaces_cached_miss(tmp_path):
+    with MappingStore(str(tmp_path / 'mappings.db')) as store:
+        assert store.lookup('name', 'Sarah Johnson') is None
+        mapping = store.assign('name', 'names', ['Sarah Johnson'])
+        replacement = mapping.get('Sarah Johnson')
+        assert replacement is not None
+        assert replacement != 'Sarah Johnson'
+
+
+def test_plan_masks_values_first_seen_after_profiling(tmp_path):
+    header = ['Name', 'Country']
+    rows = [['John Smith', 'USA'], ['Maria Garcia', 'Spain'], ['Li Wei', 'China']]
+    with MappingStore(str(tmp_path / 'mappings.db')) as store:
+        plan = ObfuscationPlan.from_rows(rows, header, mapping_store=store, seed=1)
+        new_rows = [['Sarah Johnson', 'UK'], ['Ahmed Hassan', 'Egypt']]
+        for original, obfuscated in zip(new_rows, plan.transform_batch(new_rows)):
+            assert original[0] != obfuscated[0]
+            assert original[1] != obfuscated[1]
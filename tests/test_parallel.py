@@ -0,0 +1,54 @@
+"""Tests for parallel chunked obfuscation."""
+
+import csv
+import io
+import random
+
+from csv_obfuscator import find_row_boundaries, obfuscate_csv, obfuscate_csv_parallel
+
+
+def _rows(data):
+    return list(csv.reader(io.StringIO(data.decode('utf-8'), newline='')))
+
+
+def test_row_boundaries_never_split_quoted_newlines():
+    rows = []
+    for i in range(200):
+        note = f'line one\nline two, "quoted" {i}' if i % 3 == 0 else f'note {i}'
+        rows.append([str(i), note, f'{i * 1.5:.1f}'])
+    out = io.StringIO(newline='')
+    csv.writer(out).writerows(rows)
+    buf = out.getvalue().encode('utf-8')
+
+    for chunk_bytes in (1, 7, 50, 333, len(buf)):
+        ranges = find_row_boundaries(buf, 0, chunk_bytes)
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(buf)
+        assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+        parsed = [row for start, end in ranges for row in _rows(buf[start:end])]
+        assert parsed == rows
+
+
+def test_output_does_not_depend_on_the_number_of_workers(tmp_path):
+    rng = random.Random(0)
+    input_file = str(tmp_path / 'in.csv')
+    with open(input_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'name', 'amount', 'note'])
+        for i in range(3000):
+            writer.writerow([i, rng.choice(['Ann', 'Bob', 'Cy', 'Di']) + f' {i % 500}',
+                             f'{rng.uniform(0, 1000):.2f}', 'multi\nline' if i % 7 == 0 else ''])
+
+    outputs = []
+    for workers in (1, 3):
+        output_file = str(tmp_path / f'out{workers}.csv')
+        assert obfuscate_csv_parallel(input_file, output_file, seed=5, workers=workers,
+                                      chunk_bytes=4096)
+        with open(output_file, 'rb') as f:
+            outputs.append(f.read())
+    assert outputs[0] == outputs[1]
+
+    # Same rows and columns as the single-process mode
+    memory_file = str(tmp_path / 'memory.csv')
+    assert obfuscate_csv(input_file, memory_file, seed=5)
+    with open(memory_file, 'rb') as f:
+        assert len(_rows(f.read())) == len(_rows(outputs[0]))
@@ -0,0 +1,28 @@
+"""Tests for ObfuscationPlan."""
+
+import json
+import random
+
+from csv_obfuscator import ObfuscationPlan
+
+
+def test_seed_leaves_global_random_state_alone():
+    rows = [['John Smith', str(i)] for i in range(20)]
+    state = random.getstate()
+    plan = ObfuscationPlan.from_rows(rows, ['name', 'amount'], seed=3)
+    plan.transform_batch([['Jane Doe', '5']])
+    assert random.getstate() == state
+
+
+def test_text_in_sampled_numeric_column_is_replaced():
+    header = ['id', 'customer']
+    plan = ObfuscationPlan.from_rows([[str(i), str(1000 + i)] for i in range(50)], header,
+                                     seed=1)
+    assert plan.plans[1].kind == 'numeric'
+    rows = [['1', 'Customer Name 1'], ['2', 'Customer Name 2']]
+    obfuscated = plan.transform_batch(rows)
+    assert all(new[1] != old[1] for old, new in zip(rows, obfuscated))
+
+    # The replacements are part of the saved plan
+    reloaded = ObfuscationPlan.from_dict(json.loads(json.dumps(plan.to_dict())))
+    assert [row[1] for row in reloaded.transform_batch(rows)] == [row[1] for row in obfuscated]
@@ -0,0 +1,24 @@
+"""Tests for the streaming mode."""
+
+import csv
+
+from csv_obfuscator import obfuscate_csv_stream
+
+
+def test_sample_decision_is_reversed_by_later_chunks(tmp_path):
+    input_file = str(tmp_path / 'in.csv')
+    with open(input_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['value'])
+        writer.writerows([str(i)] for i in range(3000))
+        writer.writerows([f'Customer Name {i}'] for i in range(4000))
+
+    sampled, full = str(tmp_path / 'sampled.csv'), str(tmp_path / 'full.csv')
+    assert obfuscate_csv_stream(input_file, sampled, seed=1, chunk_size=1000,
+                                sample_size=200)
+    assert obfuscate_csv_stream(input_file, full, seed=1, chunk_size=1000)
+    with open(sampled, encoding='utf-8') as f:
+        output = f.read()
+    assert 'Customer Name' not in output
+    with open(full, encoding='utf-8') as f:
+        assert output == f.read()
@@ -0,0 +1,12 @@
+"""Tests for word mappings."""
+
+import random
+
+from csv_obfuscator import WORD_CATEGORIES, _unique_words, build_word_mapping
+
+
+def test_full_size_column_gets_distinct_words():
+    for category in WORD_CATEGORIES:
+        values = [f'value {i}' for i in range(len(_unique_words(WORD_CATEGORIES[category])))]
+        mapping = build_word_mapping(values, category, random.Random(0))
+        assert len(set(mapping.values())) == len(values), category